@@ -2,7 +2,6 @@
 
 import logging
 from dataclasses import dataclass, field
-from json import dumps, loads
 from typing import Any, Dict, List, Optional
 
 import shapely.geometry
@@ -23,10 +22,17 @@ from aws.osml.model_runner.common import (
 
 from .inference import ModelInvokeMode
 from .request_utils import shared_properties_are_valid
-from .sink import VALID_SYNC_TYPES, SinkType
+from .sink import VALID_SINK_FORMATS, VALID_SYNC_TYPES, SinkType
 
 logger = logging.getLogger(__name__)
 
+# Maps the camelCase keys accepted in the postProcessing section of a request to the dataclass field names
+POST_PROCESSING_KEY_NAMES = {
+    "algorithmType": "algorithm_type",
+    "iouThreshold": "iou_threshold",
+    "skipBoxThreshold": "skip_box_threshold",
+}
+
 
 @dataclass
 class ImageRequest:
@@ -185,13 +191,26 @@ class ImageRequest:
         """
         if not post_processing:
             return [MRPostProcessing(step=MRPostprocessingStep.FEATURE_DISTILLATION, algorithm=FeatureDistillationNMS())]
-        cleaned_post_processing = loads(
-            dumps(post_processing)
-            .replace("algorithmType", "algorithm_type")
-            .replace("iouThreshold", "iou_threshold")
-            .replace("skipBoxThreshold", "skip_box_threshold")
-        )
-        return deserialize_post_processing_list(cleaned_post_processing)
+        return deserialize_post_processing_list(ImageRequest._rename_post_processing_keys(post_processing))
+
+    @staticmethod
+    def _rename_post_processing_keys(value: Any) -> Any:
+        """
+        Recursively renames the camelCase keys of the post-processing request data to the snake_case field names
+        used by the post-processing dataclasses. The input is walked directly rather than round-tripped through a
+        JSON string.
+
+        :param value: Post-processing data; a dictionary, list, or scalar value.
+        :return: A copy of the data with the keys renamed.
+        """
+        if isinstance(value, dict):
+            return {
+                POST_PROCESSING_KEY_NAMES.get(key, key): ImageRequest._rename_post_processing_keys(item)
+                for key, item in value.items()
+            }
+        if isinstance(value, list):
+            return [ImageRequest._rename_post_processing_keys(item) for item in value]
+        return value
 
     def is_valid(self) -> bool:
         """
@@ -214,6 +233,10 @@ class ImageRequest:
                 if sink_type not in VALID_SYNC_TYPES:
                     logger.error(f"Invalid sink type '{sink_type}' in ImageRequest")
                     return False
+                sink_format = output.get("format")
+                if sink_format is not None and sink_format not in VALID_SINK_FORMATS:
+                    logger.error(f"Invalid sink format '{sink_format}' in ImageRequest")
+                    return False
         return True
 
     def get_shared_values(self) -> Dict[str, Any]:
@@ -1,7 +1,9 @@
 #  Copyright 2023-2024 Amazon.com, Inc. or its affiliates.
 import logging
+import threading
 
 import boto3
+from cachetools import TTLCache, cached
 
 from aws.osml.model_runner.app_config import BotoConfig
 from aws.osml.model_runner.common import VALID_IMAGE_COMPRESSION, VALID_IMAGE_FORMATS, get_credentials_for_assumed_role
@@ -11,6 +13,12 @@ from .inference import VALID_MODEL_HOSTING_OPTIONS
 
 logger = logging.getLogger(__name__)
 
+# Number of successfully validated (image URL, role) pairs remembered so the regions of an image don't each repeat
+# the role assumption and S3 HeadObject request. Entries expire after a few minutes so an image that is deleted or
+# whose read permissions are revoked is noticed by later requests.
+VALIDATED_IMAGE_CACHE_SIZE = 128
+VALIDATED_IMAGE_CACHE_TTL = 300
+
 
 def shared_properties_are_valid(request) -> bool:
     """
@@ -96,15 +104,18 @@ def get_image_path(image_url: str, assumed_role: str) -> str:
 
     :return: The formatted image path.
     """
-    if "s3:/" in image_url:
+    if image_url.startswith("s3://"):
         validate_image_path(image_url, assumed_role)
-        return image_url.replace("s3:/", "/vsis3", 1)
+        return "/vsis3/" + image_url[5:]
     return image_url
 
 
+@cached(cache=TTLCache(maxsize=VALIDATED_IMAGE_CACHE_SIZE, ttl=VALIDATED_IMAGE_CACHE_TTL), lock=threading.Lock())
 def validate_image_path(image_url: str, assumed_role: str = None) -> bool:
     """
-    Validate if an image exists in S3 bucket
+    Validate if an image exists in S3 bucket. Successful validations are cached for VALIDATED_IMAGE_CACHE_TTL
+    seconds; failures raise and are not, so an image that is missing will be checked again the next time it is
+    requested.
 
     :param image_url: str = formatted image path to S3 bucket
     :param assumed_role: str = containing a formatted arn role
@@ -24,4 +24,16 @@ class SinkType(str, AutoStringEnum):
     KINESIS = "Kinesis"
 
 
+class SinkFormat(str, AutoStringEnum):
+    """
+    Enumeration defining the encodings available for aggregated feature outputs. GEOJSON writes a single
+    FeatureCollection; NDJSON writes one GeoJSON Feature per line so consumers can process the features as a
+    stream without loading the whole collection.
+    """
+
+    GEOJSON = auto()
+    NDJSON = auto()
+
+
 VALID_SYNC_TYPES = {sink_type.value for sink_type in SinkType}
+VALID_SINK_FORMATS = {sink_format.value for sink_format in SinkFormat}
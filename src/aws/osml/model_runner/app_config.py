@@ -45,11 +45,15 @@ class ServiceConfig:
     self_throttling: bool = (
         os.getenv("SM_SELF_THROTTLING", "False") == "True" or os.getenv("SM_SELF_THROTTLING", "False") == "true"
     )
+    # Skip TLS certificate verification for HTTP model endpoints (e.g. ones serving a self-signed certificate)
+    insecure_http_detector: bool = os.getenv("INSECURE_HTTP_DETECTOR", "False") in ("True", "true")
 
     # Optional + defaulted configuration
     region_size: str = os.getenv("REGION_SIZE", "(10240, 10240)")
     throttling_vcpu_scale_factor: str = os.getenv("THROTTLING_SCALE_FACTOR", "10")
     throttling_retry_timeout: str = os.getenv("THROTTLING_RETRY_TIMEOUT", "10")
+    # Wall-clock seconds a single HTTP model invocation, including all of its retries, may take before the tile fails
+    inference_deadline: str = os.getenv("INFERENCE_DEADLINE", "120")
 
     # Constant configuration
     kinesis_max_record_per_batch: str = "500"
@@ -108,7 +112,12 @@ class BotoConfig:
     """
 
     default: Config = Config(region_name=ServiceConfig.aws_region, retries={"max_attempts": 15, "mode": "standard"})
-    sagemaker: Config = Config(region_name=ServiceConfig.aws_region, retries={"max_attempts": 30, "mode": "adaptive"})
+    sagemaker: Config = Config(
+        region_name=ServiceConfig.aws_region,
+        retries={"max_attempts": 30, "mode": "adaptive"},
+        max_pool_connections=max(10, int(ServiceConfig.workers)),
+        tcp_keepalive=True,
+    )
     ddb: Config = Config(
         region_name=ServiceConfig.aws_region, retries={"max_attempts": 3, "mode": "standard"}, max_pool_connections=50
     )
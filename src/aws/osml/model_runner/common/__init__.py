@@ -8,8 +8,9 @@ from .auto_string_enum import AutoStringEnum
 from .credentials_utils import get_credentials_for_assumed_role
 from .endpoint_utils import EndpointUtils
 from .exceptions import InvalidAssumedRoleException
-from .feature_utils import get_feature_image_bounds
+from .feature_utils import feature_collection_to_bytes, get_feature_image_bounds, iter_features_as_ndjson
 from .log_context import ThreadingLocalContextFilter
+from .metrics_utils import NULL_METRICS_LOGGER, NullMetricsLogger, metric_scope
 from .mr_post_processing import (
     FeatureDistillationAlgorithm,
     FeatureDistillationAlgorithmType,
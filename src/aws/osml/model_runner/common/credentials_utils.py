@@ -1,8 +1,11 @@
 #  Copyright 2023-2024 Amazon.com, Inc. or its affiliates.
 
+import threading
+from datetime import datetime, timedelta, timezone
 from typing import Dict
 
 import boto3
+from cachetools import LRUCache
 
 from aws.osml.model_runner.app_config import BotoConfig
 
@@ -10,17 +13,37 @@ from .exceptions import InvalidAssumedRoleException
 
 sts_client = boto3.client("sts", config=BotoConfig.default)
 
+# Credentials are requested for the same few roles for every image and region so they are reused until they are
+# within this margin of expiring. Callers hold on to them while a region is processed (e.g. to invoke the model) so
+# the margin is the minimum lifetime any caller receives.
+CREDENTIALS_EXPIRATION_MARGIN = timedelta(minutes=30)
+ASSUMED_ROLE_CACHE_SIZE = 32
+
+_credentials_cache: LRUCache = LRUCache(maxsize=ASSUMED_ROLE_CACHE_SIZE)
+_credentials_cache_lock = threading.Lock()
+
 
 def get_credentials_for_assumed_role(assumed_role: str) -> Dict[str, str]:
     """
-    Get the credential access based on the assumed role
+    Get the credential access based on the assumed role, reusing earlier credentials for the role until they are
+    close to expiring
 
     :param assumed_role: str = containing a formatted arn role
 
     :return: Dict[str, str] = a dict that contains access key id and various of credential info
     """
+    with _credentials_cache_lock:
+        credentials = _credentials_cache.get(assumed_role)
+    if credentials is not None and credentials["Expiration"] - CREDENTIALS_EXPIRATION_MARGIN > datetime.now(timezone.utc):
+        return credentials
+
     try:
         assumed_invocation_role = sts_client.assume_role(RoleArn=assumed_role, RoleSessionName="AWSOversightMLModelRunner")
-        return assumed_invocation_role["Credentials"]
+        credentials = assumed_invocation_role["Credentials"]
     except Exception as err:
         raise InvalidAssumedRoleException(f"Cannot assume role based on provided ARN {assumed_role}") from err
+
+    if isinstance(credentials.get("Expiration"), datetime):
+        with _credentials_cache_lock:
+            _credentials_cache[assumed_role] = credentials
+    return credentials
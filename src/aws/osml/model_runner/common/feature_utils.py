@@ -1,11 +1,18 @@
 #  Copyright 2023-2024 Amazon.com, Inc. or its affiliates.
 
-from typing import Optional, Tuple
+from typing import Any, Iterable, Iterator, Optional, Tuple
 
 import geojson
 
 from aws.osml.features import ImagedFeaturePropertyAccessor
 
+# orjson is an optional dependency (pip install osml-model-runner[orjson]) that encodes JSON several times faster
+# than the standard library and can serialize NumPy values directly
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 property_accessor = ImagedFeaturePropertyAccessor()
 
 
@@ -21,3 +28,51 @@ def get_feature_image_bounds(feature: geojson.Feature) -> Optional[Tuple[float,
     if not image_geometry:
         return None
     return image_geometry.bounds
+
+
+def feature_collection_to_bytes(feature_collection: geojson.FeatureCollection) -> bytes:
+    """
+    Encode a GeoJSON feature collection as UTF-8 JSON. When orjson is available it is used for the encoding,
+    including any NumPy arrays or scalars in the features; otherwise the geojson encoder is used.
+
+    :param feature_collection: the feature collection to encode
+    :return: the encoded feature collection
+    """
+    return _geojson_to_bytes(feature_collection)
+
+
+def iter_features_as_ndjson(features: Iterable[geojson.Feature]) -> Iterator[bytes]:
+    """
+    Encode GeoJSON features as newline delimited JSON, one feature per line. The lines are produced one at a time
+    so the encoded output never has to be held in memory all at once.
+
+    :param features: the features to encode
+    :return: an iterator over the encoded lines, each terminated by a newline
+    """
+    for feature in features:
+        yield _geojson_to_bytes(feature) + b"\n"
+
+
+def _geojson_to_bytes(obj: Any) -> bytes:
+    """
+    Encode a GeoJSON object as UTF-8 JSON using orjson when it is available, see feature_collection_to_bytes.
+
+    :param obj: the GeoJSON object to encode
+    :return: the encoded object
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_to_geojson_mapping, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return geojson.dumps(obj).encode("utf-8")
+
+
+def _to_geojson_mapping(obj: Any) -> Any:
+    """
+    Fallback used by orjson for objects it can not encode natively, e.g. shapely geometries or other objects that
+    provide a __geo_interface__.
+
+    :param obj: the object to convert
+    :return: a mapping orjson can encode
+    """
+    if hasattr(obj, "__geo_interface__"):
+        return obj.__geo_interface__
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
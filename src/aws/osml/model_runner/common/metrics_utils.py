@@ -0,0 +1,58 @@
+#  Copyright 2023-2024 Amazon.com, Inc. or its affiliates.
+
+from functools import wraps
+from typing import Any, Callable
+
+from aws_embedded_metrics.metric_scope import metric_scope as aws_metric_scope
+
+
+class NullMetricsLogger:
+    """
+    A stand-in for the aws_embedded_metrics MetricsLogger that silently discards everything it is given. metric_scope
+    hands it to functions that are invoked through __wrapped__ without a logger.
+    """
+
+    def set_dimensions(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def put_dimensions(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def reset_dimensions(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def put_metric(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def set_property(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def set_namespace(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+
+NULL_METRICS_LOGGER = NullMetricsLogger()
+
+
+def metric_scope(fn: Callable) -> Callable:
+    """
+    Drop-in replacement for aws_embedded_metrics.metric_scope. Calls made through the decorator always receive a
+    new MetricsLogger from aws_embedded_metrics, which replaces any logger the caller passed. The only calls that can
+    arrive without one go through the decorated function's __wrapped__ attribute, which skips creating and flushing
+    a logger; the shared NullMetricsLogger is substituted for those so the function body never needs to check for
+    None. Unwrapping the function completely (e.g. with inspect.unwrap) bypasses this too, so a logger must be
+    passed in that case.
+
+    :param fn: the function to decorate, it must accept a "metrics" keyword argument
+    :return: the decorated function
+    """
+
+    # wraps exposes the signature of fn so aws_metric_scope still sees the metrics parameter and injects a logger;
+    # aws_metric_scope in turn exposes this wrapper as the decorated function's __wrapped__
+    @wraps(fn)
+    def with_metrics(*args, **kwargs):
+        if kwargs.get("metrics") is None:
+            kwargs["metrics"] = NULL_METRICS_LOGGER
+        return fn(*args, **kwargs)
+
+    return aws_metric_scope(with_metrics)
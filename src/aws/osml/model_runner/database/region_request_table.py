@@ -126,16 +126,7 @@ class RegionRequestTable(DDBHelper):
         """
 
         try:
-            start_time_millisec = int(time.time() * 1000)
-
-            # Update the job item to have the correct start parameters
-            region_request_item.start_time = start_time_millisec
-            region_request_item.region_status = RequestStatus.STARTED
-            region_request_item.region_retry_count = 0
-            region_request_item.succeeded_tile_count = 0
-            region_request_item.failed_tile_count = 0
-            region_request_item.processing_duration = 0
-            region_request_item.expire_time = int((start_time_millisec / 1000) + (24 * 60 * 60))
+            self._set_start_attributes(region_request_item, int(time.time() * 1000))
 
             # Put the item into the table
             self.put_ddb_item(region_request_item)
@@ -144,6 +135,45 @@ class RegionRequestTable(DDBHelper):
         except Exception as err:
             raise StartRegionException("Failed to add region request to the table!") from err
 
+    def start_region_requests(self, region_request_items: List[RegionRequestItem]) -> List[RegionRequestItem]:
+        """
+        Start processing requests for several regions at once, writing them to the table in batches rather than
+        with one request per region.
+
+        :param region_request_items: List[RegionRequestItem] = the regions we want to add to ddb
+
+        :return: List[RegionRequestItem] = Updated region request items
+        """
+        try:
+            start_time_millisec = int(time.time() * 1000)
+            for region_request_item in region_request_items:
+                self._set_start_attributes(region_request_item, start_time_millisec)
+
+            # Put the items into the table
+            self.batch_write_items(region_request_items)
+
+            return region_request_items
+        except Exception as err:
+            raise StartRegionException("Failed to add region requests to the table!") from err
+
+    @staticmethod
+    def _set_start_attributes(region_request_item: RegionRequestItem, start_time_millisec: int) -> None:
+        """
+        Update a region request item to have the correct start parameters.
+
+        :param region_request_item: RegionRequestItem = the region request item to update
+        :param start_time_millisec: int = time in epoch milliseconds when the region request started
+
+        :return: None
+        """
+        region_request_item.start_time = start_time_millisec
+        region_request_item.region_status = RequestStatus.STARTED
+        region_request_item.region_retry_count = 0
+        region_request_item.succeeded_tile_count = 0
+        region_request_item.failed_tile_count = 0
+        region_request_item.processing_duration = 0
+        region_request_item.expire_time = int((start_time_millisec / 1000) + (24 * 60 * 60))
+
     def complete_region_request(self, region_request_item: RegionRequestItem, region_status: RequestStatus):
         """
         Update the region job to reflect that a region has succeeded or failed.
@@ -8,7 +8,7 @@ from json import dumps
 from typing import List, Optional, Tuple
 
 import shapely.geometry.base
-from aws_embedded_metrics import MetricsLogger, metric_scope
+from aws_embedded_metrics import MetricsLogger
 from aws_embedded_metrics.unit import Unit
 from geojson import Feature
 from osgeo import gdal
@@ -27,6 +27,7 @@ from .common import (
     RequestStatus,
     Timer,
     get_credentials_for_assumed_role,
+    metric_scope,
     mr_post_processing_options_factory,
 )
 from .database import EndpointStatisticsTable, FeatureTable, JobItem, JobTable, RegionRequestItem, RegionRequestTable
@@ -203,26 +204,27 @@ class ImageRequestHandler:
         """
         # Set aside the first region
         first_region = all_regions.pop(0)
+        region_requests = []
         for region in all_regions:
             logger.debug(f"Queueing region: {region}")
 
-            region_request = RegionRequest(
-                image_request.get_shared_values(),
-                region_bounds=region,
-                region_id=f"{region[0]}{region[1]}-{image_request.job_id}",
-                image_extension=image_extension,
-            )
-
-            # Create a new entry to the region request being started
-            region_request_item = RegionRequestItem.from_region_request(region_request)
-            self.region_request_table.start_region_request(region_request_item)
-            logging.debug(
-                (
-                    f"Adding region request: image id: {region_request_item.image_id} - "
-                    f"region id: {region_request_item.region_id}"
+            region_requests.append(
+                RegionRequest(
+                    image_request.get_shared_values(),
+                    region_bounds=region,
+                    region_id=f"{region[0]}{region[1]}-{image_request.job_id}",
+                    image_extension=image_extension,
                 )
             )
 
+        # Create new entries for all the region requests being started in batched writes before any of them are
+        # sent to the queue
+        if region_requests:
+            region_request_items = [RegionRequestItem.from_region_request(request) for request in region_requests]
+            self.region_request_table.start_region_requests(region_request_items)
+            logging.debug(f"Added {len(region_request_items)} region requests for image id: {image_request.image_id}")
+
+        for region_request in region_requests:
             # Send the attributes of the region request as the message.
             self.region_request_queue.send_request(region_request.__dict__)
 
@@ -386,13 +388,12 @@ class ImageRequestHandler:
 
         :return: A list of deduplicated features with additional properties added.
         """
-        if isinstance(metrics, MetricsLogger):
-            metrics.set_dimensions()
-            metrics.put_dimensions(
-                {
-                    MetricLabels.OPERATION_DIMENSION: MetricLabels.FEATURE_SELECTION_OPERATION,
-                }
-            )
+        metrics.set_dimensions()
+        metrics.put_dimensions(
+            {
+                MetricLabels.OPERATION_DIMENSION: MetricLabels.FEATURE_SELECTION_OPERATION,
+            }
+        )
         with Timer(
             task_str="Select (deduplicate) image features",
             metric_name=MetricLabels.DURATION,
@@ -451,19 +452,18 @@ class ImageRequestHandler:
         self.image_status_monitor.process_event(completed_job_item, image_request_status, "Completed image processing")
 
         # Log metrics for the image processing duration, invocation, and errors (if any)
-        if isinstance(metrics, MetricsLogger):
-            metrics.set_dimensions()
-            metrics.put_dimensions(
-                {
-                    MetricLabels.OPERATION_DIMENSION: MetricLabels.IMAGE_PROCESSING_OPERATION,
-                    MetricLabels.MODEL_NAME_DIMENSION: job_item.model_name,
-                    MetricLabels.INPUT_FORMAT_DIMENSION: image_format,
-                }
-            )
-            metrics.put_metric(MetricLabels.DURATION, float(job_item.processing_duration), str(Unit.SECONDS.value))
-            metrics.put_metric(MetricLabels.INVOCATIONS, 1, str(Unit.COUNT.value))
-            if job_item.region_error > 0:
-                metrics.put_metric(MetricLabels.ERRORS, 1, str(Unit.COUNT.value))
+        metrics.set_dimensions()
+        metrics.put_dimensions(
+            {
+                MetricLabels.OPERATION_DIMENSION: MetricLabels.IMAGE_PROCESSING_OPERATION,
+                MetricLabels.MODEL_NAME_DIMENSION: job_item.model_name,
+                MetricLabels.INPUT_FORMAT_DIMENSION: image_format,
+            }
+        )
+        metrics.put_metric(MetricLabels.DURATION, float(job_item.processing_duration), str(Unit.SECONDS.value))
+        metrics.put_metric(MetricLabels.INVOCATIONS, 1, str(Unit.COUNT.value))
+        if job_item.region_error > 0:
+            metrics.put_metric(MetricLabels.ERRORS, 1, str(Unit.COUNT.value))
 
     @staticmethod
     def calculate_processing_bounds(
@@ -507,13 +507,12 @@ class ImageRequestHandler:
         :raises AggregateOutputFeaturesException: If sinking the features to the output fails.
         :return: None
         """
-        if isinstance(metrics, MetricsLogger):
-            metrics.set_dimensions()
-            metrics.put_dimensions(
-                {
-                    MetricLabels.OPERATION_DIMENSION: MetricLabels.FEATURE_DISSEMINATE_OPERATION,
-                }
-            )
+        metrics.set_dimensions()
+        metrics.put_dimensions(
+            {
+                MetricLabels.OPERATION_DIMENSION: MetricLabels.FEATURE_DISSEMINATE_OPERATION,
+            }
+        )
         with Timer(
             task_str="Sink image features",
             metric_name=MetricLabels.DURATION,
@@ -2,12 +2,30 @@
 
 import abc
 from io import BufferedReader
+from typing import Any
 
 from aws_embedded_metrics.logger.metrics_logger import MetricsLogger
-from aws_embedded_metrics.metric_scope import metric_scope
 from geojson import FeatureCollection
 
 from aws.osml.model_runner.api import ModelInvokeMode
+from aws.osml.model_runner.common import metric_scope
+
+
+def normalize_feature_properties(feature_collection: Any) -> Any:
+    """
+    Replace the missing or null properties of every feature in a decoded model response with an empty dictionary.
+    GeoJSON allows a Feature's properties to be null but the rest of the pipeline adds properties to every feature
+    so this is done once, as soon as the response has been decoded.
+
+    :param feature_collection: Any = the decoded model response, normally a GeoJSON FeatureCollection dictionary
+
+    :return: Any = the same model response with the feature properties updated in place
+    """
+    if isinstance(feature_collection, dict):
+        for feature in feature_collection.get("features") or ():
+            if isinstance(feature, dict) and feature.get("properties") is None:
+                feature["properties"] = {}
+    return feature_collection
 
 
 class Detector(abc.ABC):
@@ -1,9 +1,14 @@
 #  Copyright 2023-2024 Amazon.com, Inc. or its affiliates.
 
-from collections import OrderedDict
-from typing import List, Tuple
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
 
-from ensemble_boxes import nms, soft_nms
+import numpy as np
 from geojson import Feature
 
 from aws.osml.model_runner.common import (
@@ -12,6 +17,55 @@ from aws.osml.model_runner.common import (
     get_feature_image_bounds,
 )
 from aws.osml.model_runner.inference.exceptions import FeatureDistillationException
+from aws.osml.model_runner.inference.nms_kernels import box_areas, nms, offset_boxes_by_label, soft_nms
+
+logger = logging.getLogger(__name__)
+
+# Shared read-only stand-in for missing feature properties so lookups on the hot path never allocate an empty dict
+_EMPTY: Dict[str, Any] = {}
+
+# Shipping features to another process costs more than selecting them for small batches so those are run in-process
+PARALLEL_SELECTION_MIN_FEATURES = 10000
+
+# A single pool of worker processes is shared by all selectors; it is created the first time it is needed
+_selection_pool: Optional[ProcessPoolExecutor] = None
+_selection_pool_workers = 0
+_selection_pool_lock = threading.Lock()
+
+
+def _get_selection_pool(n_workers: int) -> ProcessPoolExecutor:
+    """
+    Get the shared process pool used to run feature selection in parallel, creating it if needed. Worker processes
+    are spawned rather than forked since the parent process runs many threads.
+
+    :param n_workers: the number of worker processes to use
+    :return: the process pool
+    """
+    global _selection_pool, _selection_pool_workers
+    with _selection_pool_lock:
+        if _selection_pool is None or _selection_pool_workers != n_workers:
+            if _selection_pool is not None:
+                _selection_pool.shutdown(wait=False)
+            _selection_pool = ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context("spawn"))
+            _selection_pool_workers = n_workers
+        return _selection_pool
+
+
+def _reset_selection_pool(pool: ProcessPoolExecutor) -> None:
+    """
+    Discard the shared process pool so the next call to _get_selection_pool creates a new one. A pool can not be
+    reused once one of its worker processes has died. The pool is only discarded if it has not already been replaced
+    by another thread.
+
+    :param pool: the broken process pool
+    :return: None
+    """
+    global _selection_pool, _selection_pool_workers
+    with _selection_pool_lock:
+        if _selection_pool is pool:
+            _selection_pool = None
+            _selection_pool_workers = 0
+    pool.shutdown(wait=False)
 
 
 class FeatureSelector:
@@ -42,171 +96,176 @@ class FeatureSelector:
             return []
         if not self.options:
             return feature_list
-        boxes_list, scores_list, labels_list = self._get_lists_from_features(feature_list)
+        return self._get_features_from_lists(feature_list, *self._select_feature_indices(feature_list))
+
+    def select_features_batch(
+        self, feature_lists: List[List[Feature]], n_workers: Optional[int] = None
+    ) -> List[List[Feature]]:
+        """
+        Selects features from many independent groups of features (e.g. the features found in each tile overlap).
+        Large batches are distributed across a pool of worker processes; small batches are processed in-process
+        since the cost of moving the features between processes would outweigh the benefit. If the pool breaks the
+        batch is processed in-process and a new pool is created for the next batch. The workers only return the
+        indexes and updated scores of the selected features, which are applied to the caller's features here, so
+        the results (including the rescored features of Soft NMS) are the same whichever way a batch is processed.
+
+        :param feature_lists: the groups of features to run selection on
+        :param n_workers: the number of worker processes to use, defaults to the number of CPUs up to 4
+        :return: the filtered list of features for each group
+        """
+        n_workers = n_workers or min(4, os.cpu_count() or 1)
+        total_features = sum(len(feature_list) for feature_list in feature_lists)
+        if not self.options or n_workers < 2 or len(feature_lists) < 2 or total_features < PARALLEL_SELECTION_MIN_FEATURES:
+            return [self.select_features(feature_list) for feature_list in feature_lists]
+
+        chunksize = max(1, len(feature_lists) // (n_workers * 4))
+        pool = _get_selection_pool(n_workers)
+        try:
+            selections = list(pool.map(self._select_feature_indices, feature_lists, chunksize=chunksize))
+        except BrokenProcessPool:
+            # A worker process died (e.g. it was killed for using too much memory); replace the pool for later
+            # batches and finish this one in-process
+            logger.warning("Feature selection worker pool is broken, running selection in-process")
+            _reset_selection_pool(pool)
+            return [self.select_features(feature_list) for feature_list in feature_lists]
+        return [
+            self._get_features_from_lists(feature_list, *selection)
+            for feature_list, selection in zip(feature_lists, selections)
+        ]
+
+    def _select_feature_indices(
+        self, feature_list: List[Feature]
+    ) -> Tuple[Optional[np.ndarray], Optional[np.ndarray], Optional[List[str]]]:
+        """
+        Runs the selection algorithm on a list of features without modifying them. See _get_features_from_lists
+        for applying the result to the features.
+
+        :param feature_list: a list of geojson features with a property of bounds_imcoords
+        :return: tuple - the indexes of the selected features (None if every feature is kept unchanged), their
+            updated scores and the category each score applies to (both None if the scores are unchanged)
+        """
+        if not feature_list:
+            return np.empty(0, dtype=np.intp), None, None
+        if self.options.algorithm_type == FeatureDistillationAlgorithmType.NMS and (
+            len(feature_list) == 1 or self.options.iou_threshold >= 1.0
+        ):
+            # NMS can not suppress a lone feature and no two boxes can overlap by more than an IoU of 1.0
+            return None, None, None
+        boxes, scores, labels, areas, label_categories = self._get_lists_from_features(feature_list)
+
+        # Shift the boxes of each label into their own disjoint coordinate range so that a single class-agnostic
+        # pass of the selection algorithm never lets features of different categories suppress each other.
+        boxes = offset_boxes_by_label(boxes, labels)
         if self.options.algorithm_type == FeatureDistillationAlgorithmType.SOFT_NMS:
-            boxes, scores, labels = soft_nms(
-                [boxes_list],
-                [scores_list],
-                [labels_list],
-                weights=None,
-                iou_thr=self.options.iou_threshold,
+            keep, scores = soft_nms(
+                boxes,
+                scores,
                 sigma=self.options.sigma,
                 thresh=self.options.skip_box_threshold,
+                areas=areas,
             )
+            return keep, scores, [label_categories[label] for label in labels[keep]]
         elif self.options.algorithm_type == FeatureDistillationAlgorithmType.NMS:
-            boxes, scores, labels = nms(
-                [boxes_list], [scores_list], [labels_list], weights=None, iou_thr=self.options.iou_threshold
-            )
+            return nms(boxes, scores, self.options.iou_threshold, areas=areas), None, None
         else:
             raise FeatureDistillationException(f"Invalid feature distillation algorithm: {self.options.algorithm_type}")
-        return self._get_features_from_lists(boxes, scores, labels)
 
-    def _get_lists_from_features(self, feature_list: List[Feature]) -> Tuple[List, List, List]:
+    def _get_lists_from_features(
+        self, feature_list: List[Feature]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, List[str]]:
         """
-        This function converts the GeoJSON features into lists of normalized bounding boxes, scores, and label IDs
-        needed by the selection algorithm implementations. As a side effect of this function various class attributes
-        are set to support the inverse mapping of algorithm primitives to the full features. See
-        _get_features_from_lists for the inverse function.
+        This function converts the GeoJSON features into bounding boxes, scores, and label IDs needed by the
+        selection algorithm implementations. The boxes are left in pixel coordinates; IoU is unchanged by scaling
+        the axes so there is no need to normalize them. The results are index aligned with the input features so
+        the algorithms can identify the selected features by their position. The box areas are computed once here
+        and shared by every IoU computation the algorithms make. See _get_features_from_lists for the inverse
+        function.
 
         :param feature_list: the input set of GeoJSON features to preprocess
-        :return: tuple of lists - bounding boxes, confidence scores, category labels
+        :return: tuple - (N, 4) array of bounding boxes, (N,) array of confidence scores, (N,) array of label ids,
+            (N,) array of box areas, the category of each label id
         """
+        # [min_x, min_y, max_x, max_y] stored as float64 so the 0.1 pixel padding below survives the label offsets
+        # applied before selection, which can shift the boxes of a full-scene image millions of pixels
+        boxes = np.array([get_feature_image_bounds(feature) for feature in feature_list], dtype=np.float64)
 
-        boxes = []
-        scores = []
-        categories = []
-        self.extents = [None, None, None, None]  # [min_x, min_y, max_x, max_y]
-        self.feature_id_map = OrderedDict()
-        self.labels_map = dict()
-
-        for feature in feature_list:
-            # [min_x, min_y, max_x, max_y]
-            bounds_imcoords = get_feature_image_bounds(feature)
-
-            # This is a workaround for assumptions made by the NMS library and normalization code in this class.
-            # All of that code assumes that features have bounding boxes with a non-zero area. That assumption
-            # does not hold for features reported as a single point geometry or others that might simply be
-            # erroneously reported with a zero width or height bbox. No matter the cause, we would like those
-            # features to pass through our feature selection processing without triggering errors. Here we
-            # add 0.1 of a pixel to the width or height of any bbox if it is currently zero. This does not change
-            # the actual reported geometry of the feature in any way it just ensures the assumption of a non-zero
-            # area is true.
-            bounds_imcoords = (
-                bounds_imcoords[0],
-                bounds_imcoords[1],
-                bounds_imcoords[2] + 0.1 if bounds_imcoords[0] == bounds_imcoords[2] else bounds_imcoords[2],
-                bounds_imcoords[3] + 0.1 if bounds_imcoords[1] == bounds_imcoords[3] else bounds_imcoords[3],
-            )
+        # This is a workaround for assumptions made by the NMS algorithms in this class.
+        # All of that code assumes that features have bounding boxes with a non-zero area. That assumption
+        # does not hold for features reported as a single point geometry or others that might simply be
+        # erroneously reported with a zero width or height bbox. No matter the cause, we would like those
+        # features to pass through our feature selection processing without triggering errors. Here we
+        # add 0.1 of a pixel to the width or height of any bbox if it is currently zero. This does not change
+        # the actual reported geometry of the feature in any way it just ensures the assumption of a non-zero
+        # area is true.
+        boxes[boxes[:, 2] == boxes[:, 0], 2] += 0.1
+        boxes[boxes[:, 3] == boxes[:, 1], 3] += 0.1
 
-            category, score = self._get_category_and_score_from_feature(feature)
-            boxes.append(bounds_imcoords)
-            categories.append(category)
-            scores.append(score)
-            if self.extents[0] is None or self.extents[0] > bounds_imcoords[0]:
-                self.extents[0] = bounds_imcoords[0]
-            if self.extents[1] is None or self.extents[1] > bounds_imcoords[1]:
-                self.extents[1] = bounds_imcoords[1]
-            if self.extents[2] is None or self.extents[2] < bounds_imcoords[2]:
-                self.extents[2] = bounds_imcoords[2]
-            if self.extents[3] is None or self.extents[3] < bounds_imcoords[3]:
-                self.extents[3] = bounds_imcoords[3]
-            bounds_imcoords_rounded = [int(round(coord)) for coord in bounds_imcoords]
-            feature_hash_id = hash(str(bounds_imcoords_rounded) + category)
-            self.feature_id_map[feature_hash_id] = feature
-        unique_categories = list(set(categories))
-        for idx, unique_category in enumerate(unique_categories):
-            self.labels_map[str(idx)] = unique_category
-            self.labels_map[unique_category] = str(idx)
-        labels_indexes = [int(self.labels_map.get(category, None)) for category in categories]
-        normalized_boxes = self._normalize_boxes(boxes)
-
-        return normalized_boxes, scores, labels_indexes
-
-    def _normalize_boxes(self, boxes: List[List[int]]) -> List[List[float]]:
-        """
-        This function normalizes the bounding boxes by subtracting the minimum x and y coordinates from each
-        coordinate and dividing by the range of x and y coordinates. That means that all bounding boxes coordinates
-        will be in the range of [0.0, 1.0] where 0.0 is the minimum of the extent and 1.0 is the maximum. See
-        _denormalize_boxes() to convert back to bboxes in pixel coordinates.
+        categories, scores = self._get_categories_and_scores_from_features(feature_list)
+        # Label ids are assigned in order of first appearance by hashing the categories, which avoids the string
+        # sort np.unique would need and builds the ids without an intermediate Python list
+        label_ids: Dict[str, int] = {}
+        labels = np.fromiter(
+            (label_ids.setdefault(category, len(label_ids)) for category in categories),
+            dtype=np.int32,
+            count=len(categories),
+        )
 
-        :param boxes: the list of bounding boxes to normalize
-        :return: the normalized list of bounding boxes
-        """
-        # boxes: [x1, y1, x2, y2]
-        min_x = self.extents[0]
-        min_y = self.extents[1]
-        x_range = self.extents[2] - self.extents[0]
-        y_range = self.extents[3] - self.extents[1]
-        normalized_boxes = []
-        for box in boxes:
-            x1_norm = (box[0] - min_x) / x_range
-            y1_norm = (box[1] - min_y) / y_range
-            x2_norm = (box[2] - min_x) / x_range
-            y2_norm = (box[3] - min_y) / y_range
-            normalized_boxes.append([x1_norm, y1_norm, x2_norm, y2_norm])
-        return normalized_boxes
+        return boxes, scores, labels, box_areas(boxes), list(label_ids)
 
     @staticmethod
-    def _get_category_and_score_from_feature(feature: Feature) -> Tuple[str, float]:
+    def _get_categories_and_scores_from_features(feature_list: List[Feature]) -> Tuple[List[str], np.ndarray]:
         """
-        Get the feature class with the highest score from the featureClasses property.
+        Get the feature class with the highest score from the featureClasses property of every feature. The scores
+        are gathered into a single (N, C) matrix padded with -1.0 so the best class of every feature can be found
+        with one argmax. Features without a class scoring above -1.0 are assigned an empty category.
 
-        :return: tuple of feature class and highest score
-        """
-        max_score = -1.0
-        max_class = ""
-        for feature_class in feature.get("properties", {}).get("featureClasses", []):
-            if feature_class.get("score") > max_score:
-                max_score = feature_class.get("score")
-                max_class = feature_class.get("iri")
-        return max_class, max_score
-
-    def _get_features_from_lists(self, boxes: List, scores: List, labels: List) -> List[Feature]:
+        :param feature_list: the features to get the classes of
+        :return: tuple of the feature class and highest score for each feature
         """
-        This function consolidates the lists of bounding boxes, scores, and labels into the GeoJSON features.
-        This happens by finding the feature with a matching bounding box and category in the original feature list
-        and updating the score if necessary. Any features that were in the original feature list that were not
-        in the input lists end up filtered out of the result.
-
-        :param boxes: the normalized bounding boxes for the features
-        :param scores: the updated scores for each bounding box
-        :param labels: the labels for each bounding box
-        :return: the refined list of GeoJSON features
-        """
-        features = []
-        im_boxes = self._denormalize_boxes(boxes)
-        for box, score, label in zip(im_boxes, scores, labels):
-            category = self.labels_map.get(str(label))
-            feature_hash_id = hash(str(box) + category)
-            feature = self.feature_id_map.get(feature_hash_id)
-            if feature:
-                if self.options.algorithm_type == FeatureDistillationAlgorithmType.SOFT_NMS:
-                    for feature_class in feature.get("properties", {}).get("featureClasses", []):
-                        if feature_class.get("iri") == category:
-                            feature_class["rawScore"] = feature_class.get("score")
-                            feature_class["score"] = score
-                features.append(feature)
-        return features
+        feature_classes = [feature.get("properties", _EMPTY).get("featureClasses", ()) for feature in feature_list]
+
+        # The extra column guarantees every row has at least one padding value for argmax to return
+        max_classes = max(len(classes) for classes in feature_classes)
+        class_scores = np.full((len(feature_list), max_classes + 1), -1.0)
+        for row, classes in enumerate(feature_classes):
+            class_scores[row, : len(classes)] = [feature_class.get("score") for feature_class in classes]
+
+        best_classes = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(feature_list)), best_classes]
+        categories = [
+            classes[best].get("iri") if score > -1.0 else ""
+            for classes, best, score in zip(feature_classes, best_classes, scores)
+        ]
+        return categories, scores
 
-    def _denormalize_boxes(self, boxes: List[List[float]]) -> List[List[int]]:
+    @staticmethod
+    def _get_features_from_lists(
+        feature_list: List[Feature],
+        indices: Optional[np.ndarray],
+        scores: Optional[np.ndarray],
+        categories: Optional[List[str]],
+    ) -> List[Feature]:
         """
-        This function denormalizes the bounding boxes by multiplying each coordinate by the width or height
-        of the extent and then adding in the extent minimums. That puts all bounding boxes back into the
-        image coordinate space. This is the inverse of _normalize_boxes().
+        This function consolidates the results of the selection algorithm back into the GeoJSON features. The
+        algorithms return the indexes of the selected features along with their updated scores; any features not
+        referenced by those indexes end up filtered out of the result. Updated scores are written into the
+        featureClasses of the selected features, keeping the original score as rawScore.
 
-        :param boxes: the list of bounding boxes to denormalize
-        :return: the denormalized list of bounding boxes
+        :param feature_list: the original list of GeoJSON features
+        :param indices: the indexes of the selected features in the original list, None to keep every feature
+        :param scores: the updated scores for each selected feature, None if the scores are unchanged
+        :param categories: the category each updated score applies to
+        :return: the refined list of GeoJSON features
         """
-        # boxes: [x1, y1, x2, y2]
-        min_x = self.extents[0]
-        min_y = self.extents[1]
-        x_range = self.extents[2] - self.extents[0]
-        y_range = self.extents[3] - self.extents[1]
-        denormalized_boxes = []
-        for box in boxes:
-            x1 = int(round(box[0] * x_range + min_x))
-            y1 = int(round(box[1] * y_range + min_y))
-            x2 = int(round(box[2] * x_range + min_x))
-            y2 = int(round(box[3] * y_range + min_y))
-            denormalized_boxes.append([x1, y1, x2, y2])
-        return denormalized_boxes
+        if indices is None:
+            return feature_list
+        features = [feature_list[index] for index in indices]
+        if scores is None:
+            return features
+
+        for feature, category, score in zip(features, categories, scores):
+            for feature_class in feature.get("properties", _EMPTY).get("featureClasses", ()):
+                if feature_class.get("iri") == category:
+                    feature_class["rawScore"] = feature_class.get("score")
+                    feature_class["score"] = float(score)
+        return features
@@ -1,15 +1,13 @@
 #  Copyright 2023-2024 Amazon.com, Inc. or its affiliates.
 
 import functools
-import json
 import logging
-import math
 from datetime import datetime
-from math import degrees, radians
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
+import numpy as np
 import shapely
-from geojson import Feature, LineString, MultiLineString, MultiPoint, MultiPolygon, Point, Polygon
+from geojson import Feature
 from osgeo import gdal
 from shapely.geometry.base import BaseGeometry
 
@@ -18,8 +16,72 @@ from aws.osml.photogrammetry import GeodeticWorldCoordinate, ImageCoordinate, Se
 
 from .exceptions import InvalidFeaturePropertiesException
 
+# orjson is an optional dependency that serializes and parses JSON several times faster than the standard library.
+# Its dumps returns bytes rather than a str, both of which are accepted by the GEOS GeoJSON reader.
+try:
+    from orjson import dumps as json_dumps
+    from orjson import loads as json_loads
+except ImportError:
+    from json import dumps as json_dumps
+    from json import loads as json_loads
+
 logger = logging.getLogger(__name__)
 
+# Internal properties removed from features before they are written to the job outputs
+UNNEEDED_FEATURE_PROPERTIES = (
+    "inferenceTime",
+    GeojsonDetectionField.BOUNDS,
+    GeojsonDetectionField.GEOM,
+    "detection_score",
+    "feature_types",
+    "image_id",
+    "adjusted_feature_types",
+)
+
+
+def _polygon_from_coordinates(coordinates: List) -> BaseGeometry:
+    """
+    Build a shapely Polygon from GeoJSON Polygon coordinates, the exterior ring followed by any holes.
+
+    :param coordinates: List = the rings of the polygon
+    :return: BaseGeometry = the shapely Polygon
+    """
+    return shapely.geometry.Polygon(coordinates[0], coordinates[1:])
+
+
+def _multipolygon_from_coordinates(coordinates: List) -> BaseGeometry:
+    """
+    Build a shapely MultiPolygon from GeoJSON MultiPolygon coordinates.
+
+    :param coordinates: List = the rings of each polygon
+    :return: BaseGeometry = the shapely MultiPolygon
+    """
+    return shapely.geometry.MultiPolygon([(polygon[0], polygon[1:]) for polygon in coordinates])
+
+
+def _geometry_from_geojson(geometry_type: str, coordinates: List) -> BaseGeometry:
+    """
+    Build a shapely geometry by handing the GeoJSON geometry to the GEOS GeoJSON reader.
+
+    :param geometry_type: str = the GeoJSON geometry type
+    :param coordinates: List = the coordinates of the geometry
+    :return: BaseGeometry = the shapely geometry
+    """
+    return shapely.from_geojson(json_dumps({"type": geometry_type, "coordinates": coordinates}))
+
+
+# Constructors for the GeoJSON geometry types that can be converted to shapely shapes. Points and polygons, the most
+# common detection geometries, are built directly from their coordinates; the GEOS GeoJSON reader is faster than
+# shapely's constructors for the remaining types.
+GEOJSON_GEOMETRY_CONSTRUCTORS: Dict[str, Callable[[List], BaseGeometry]] = {
+    "Point": shapely.Point,
+    "LineString": functools.partial(_geometry_from_geojson, "LineString"),
+    "Polygon": _polygon_from_coordinates,
+    "MultiPoint": functools.partial(_geometry_from_geojson, "MultiPoint"),
+    "MultiLineString": functools.partial(_geometry_from_geojson, "MultiLineString"),
+    "MultiPolygon": _multipolygon_from_coordinates,
+}
+
 
 def features_to_image_shapes(
     sensor_model: SensorModel, features: List[Feature], skip: Optional[bool] = True
@@ -53,29 +115,21 @@ def features_to_image_shapes(
             if "geometry" not in feature or "coordinates" not in feature["geometry"]:
                 raise ValueError(f"Invalid feature, missing 'geometry' or 'coordinates': {feature}")
 
-            # Extract the base geometry of the GeoJSON feature
+            # Extract the base geometry of the GeoJSON feature and make sure it can be converted before projecting it
             feature_geometry = feature["geometry"]
+            geometry_constructor = GEOJSON_GEOMETRY_CONSTRUCTORS.get(feature_geometry.get("type"))
+            if geometry_constructor is None:
+                error = f"Invalid geometry in: {feature_geometry}"
+                raise ValueError(error)
 
             # Project the coordinates from world coordinates to image coordinates
-            image_coords = convert_nested_coordinate_lists(feature_geometry["coordinates"], sensor_model.world_to_image)
+            image_coords = convert_nested_coordinate_lists_batch(
+                feature_geometry["coordinates"], functools.partial(world_to_image_batch, sensor_model)
+            )
             feature_geometry["coordinates"] = image_coords
 
             # Covert to a Shapely instance and append to the returned shapes
-            if isinstance(feature_geometry, Point):
-                shapes.append(shapely.geometry.Point(image_coords))
-            elif isinstance(feature_geometry, LineString):
-                shapes.append(shapely.geometry.LineString(image_coords))
-            elif isinstance(feature_geometry, Polygon):
-                shapes.append(shapely.geometry.shape(feature_geometry))
-            elif isinstance(feature_geometry, MultiPoint):
-                shapes.append(shapely.geometry.MultiPoint(image_coords))
-            elif isinstance(feature_geometry, MultiLineString):
-                shapes.append(shapely.geometry.MultiLineString(image_coords))
-            elif isinstance(feature_geometry, MultiPolygon):
-                shapes.append(shapely.geometry.shape(feature_geometry))
-            else:
-                error = f"Invalid geometry in: {feature_geometry}"
-                raise ValueError(error)
+            shapes.append(geometry_constructor(image_coords))
         except ValueError as err:
             error = f"Failed to transform {feature} with error: {err}"
             if skip is True:
@@ -86,33 +140,115 @@ def features_to_image_shapes(
     return shapes
 
 
-def convert_nested_coordinate_lists(coordinates_or_lists: List, conversion_function: Callable) -> Union[Tuple, List]:
+def convert_nested_coordinate_lists_batch(
+    coordinates_or_lists: List, batch_conversion_function: Callable[[np.ndarray], np.ndarray]
+) -> Union[Tuple, List]:
     """
-    Convert a nested list of coordinates to 3D world GIS coordinates
+    Convert a nested list of coordinates to image coordinates in a single batch. The nesting is walked once to
+    gather every coordinate into an (N, 3) array of longitude and latitude in radians and elevation, which is
+    handed to the conversion function as a whole. The converted coordinates are then placed back into the original
+    nesting structure.
 
     :param coordinates_or_lists: List = a coordinate or list of coordinates to transform
-    :param conversion_function: Callable = the function to use for the GIS transform
+    :param batch_conversion_function: Callable = converts an (N, 3) array of world coordinates to (N, 2) image
+        coordinates
 
     :return: Union[Tuple, List] = the transformed list of coordinates
     """
-    if not isinstance(coordinates_or_lists[0], List):
-        # This appears to be a single coordinate so run it through the supplied conversion
-        # function (i.e. world_to_image). Ensure that the coordinate has an elevation and convert
-        # the longitude, latitude to radians to meet the expectations of the sensor model.
-        world_coordinate_3d = [radians(coordinates_or_lists[0]), radians(coordinates_or_lists[1])]
+    world_coordinates = []
+    _flatten_nested_coordinate_lists(coordinates_or_lists, world_coordinates)
+    world_coordinates = np.asarray(world_coordinates, dtype=np.float64)
+    np.deg2rad(world_coordinates[:, :2], out=world_coordinates[:, :2])
+    image_coordinates = iter(np.asarray(batch_conversion_function(world_coordinates)).tolist())
+    return _rebuild_nested_coordinate_lists(coordinates_or_lists, image_coordinates)
+
+
+def world_to_image_batch(sensor_model: SensorModel, world_coordinates: np.ndarray) -> np.ndarray:
+    """
+    Convert an array of world coordinates to image coordinates. Sensor models that provide a world_to_image_batch
+    method are handed the contiguous array directly; otherwise each coordinate is converted individually and
+    written into a preallocated output array.
+
+    :param sensor_model: SensorModel = the model to use for the transform
+    :param world_coordinates: np.ndarray = (N, 3) array of longitude, latitude (radians) and elevation (meters)
+
+    :return: np.ndarray = (N, 2) array of image coordinates
+    """
+    world_coordinates = np.ascontiguousarray(world_coordinates, dtype=np.float64)
+    if hasattr(sensor_model, "world_to_image_batch"):
+        return np.asarray(sensor_model.world_to_image_batch(world_coordinates), dtype=np.float64)
+
+    image_coordinates = np.empty((len(world_coordinates), 2), dtype=np.float64)
+    for index, world_coordinate in enumerate(world_coordinates):
+        image_coordinates[index] = sensor_model.world_to_image(GeodeticWorldCoordinate(world_coordinate)).coordinate
+    return image_coordinates
+
+
+def image_to_world_batch(sensor_model: SensorModel, image_coordinates: np.ndarray) -> np.ndarray:
+    """
+    Convert an array of image coordinates to world coordinates. Sensor models that provide an image_to_world_batch
+    method are handed the contiguous array directly; otherwise each coordinate is converted individually and
+    written into a preallocated output array.
+
+    :param sensor_model: SensorModel = the model to use for the transform
+    :param image_coordinates: np.ndarray = (N, 2) array of image coordinates
+
+    :return: np.ndarray = (N, 3) array of longitude, latitude (radians) and elevation (meters)
+    """
+    image_coordinates = np.ascontiguousarray(image_coordinates, dtype=np.float64)
+    if hasattr(sensor_model, "image_to_world_batch"):
+        return np.asarray(sensor_model.image_to_world_batch(image_coordinates), dtype=np.float64)
+
+    world_coordinates = np.empty((len(image_coordinates), 3), dtype=np.float64)
+    for index, image_coordinate in enumerate(image_coordinates):
+        world_coordinates[index] = sensor_model.image_to_world(ImageCoordinate(image_coordinate)).coordinate
+    return world_coordinates
+
+
+def _flatten_nested_coordinate_lists(coordinates_or_lists: List, world_coordinates: List[Tuple]) -> None:
+    """
+    Append every coordinate in a nested list of coordinates to a flat list, in order, ensuring each one has an
+    elevation.
+
+    :param coordinates_or_lists: List = a coordinate or list of coordinates
+    :param world_coordinates: List[Tuple] = the flat list of 3D coordinates to append to
+
+    :return: None
+    """
+    # The nesting is tested against the builtin list type since isinstance checks against typing.List are several
+    # times slower. Lists of coordinates (e.g. LineStrings and rings) are gathered in a single loop rather than
+    # recursing once per coordinate.
+    if not isinstance(coordinates_or_lists[0], list):
         if len(coordinates_or_lists) == 2:
-            world_coordinate_3d.append(0.0)
+            world_coordinates.append((coordinates_or_lists[0], coordinates_or_lists[1], 0.0))
         else:
-            world_coordinate_3d.append(coordinates_or_lists[2])
-        image_coordinate = conversion_function(GeodeticWorldCoordinate(world_coordinate_3d))
-        return tuple(list(image_coordinate.coordinate))
+            world_coordinates.append((coordinates_or_lists[0], coordinates_or_lists[1], coordinates_or_lists[2]))
+    elif not isinstance(coordinates_or_lists[0][0], list):
+        world_coordinates.extend([(c[0], c[1], 0.0) if len(c) == 2 else (c[0], c[1], c[2]) for c in coordinates_or_lists])
     else:
-        # This appears to be a list of lists (i.e. a LineString, Polygon, etc.) so invoke this
-        # conversion routine recursively to preserve the nesting structure of the input
-        output_list = []
         for coordinate_list in coordinates_or_lists:
-            output_list.append(convert_nested_coordinate_lists(coordinate_list, conversion_function))
-        return output_list
+            _flatten_nested_coordinate_lists(coordinate_list, world_coordinates)
+
+
+def _rebuild_nested_coordinate_lists(
+    coordinates_or_lists: List, converted_coordinates: Iterator[List]
+) -> Union[Tuple, List]:
+    """
+    Rebuild the nesting structure of a list of coordinates using converted coordinates taken in order from the
+    provided iterator. This is the inverse of _flatten_nested_coordinate_lists.
+
+    :param coordinates_or_lists: List = the original coordinate or list of coordinates
+    :param converted_coordinates: Iterator[List] = the converted coordinates in flattened order
+
+    :return: Union[Tuple, List] = the converted coordinates with the nesting structure of the original
+    """
+    if not isinstance(coordinates_or_lists[0], list):
+        return tuple(next(converted_coordinates))
+    if not isinstance(coordinates_or_lists[0][0], list):
+        return [tuple(next(converted_coordinates)) for _ in coordinates_or_lists]
+    return [
+        _rebuild_nested_coordinate_lists(coordinate_list, converted_coordinates) for coordinate_list in coordinates_or_lists
+    ]
 
 
 def calculate_processing_bounds(
@@ -132,37 +268,36 @@ def calculate_processing_bounds(
         (ds.RasterXSize, ds.RasterYSize),
     )
     if roi is not None and sensor_model is not None:
-        full_image_area = shapely.geometry.Polygon(
-            [(0, 0), (0, ds.RasterYSize), (ds.RasterXSize, ds.RasterYSize), (ds.RasterXSize, 0)]
-        )
-
         # This is making the assumption that the ROI is a shapely Polygon, and it only considers
         # the exterior boundary (i.e. we don't handle cases where the WKT for the ROI has holes).
         # It also assumes that the coordinates of the WKT string are in longitude latitude order
-        # to match GeoJSON
-        world_coordinates_3d = []
-        list_coordinates = shapely.geometry.mapping(roi)["coordinates"][0]
-        for coord in list_coordinates:
-            if len(coord) == 3:
-                world_coordinates_3d.append(coord)
-            else:
-                world_coordinates_3d.append(coord + (0.0,))
-        roi_area = features_to_image_shapes(sensor_model, [Feature(geometry=Polygon([tuple(world_coordinates_3d)]))], False)[
-            0
-        ]
-
-        if roi_area.intersects(full_image_area):
-            area_to_process = roi_area.intersection(full_image_area)
+        # to match GeoJSON. The coordinates are read straight from the GEOS coordinate sequence, given an
+        # elevation if they do not have one, and projected into the image as a single batch.
+        world_coordinates = np.array(roi.exterior.coords, dtype=np.float64)
+        if world_coordinates.shape[1] == 2:
+            world_coordinates = np.column_stack([world_coordinates, np.zeros(len(world_coordinates))])
+        np.deg2rad(world_coordinates[:, :2], out=world_coordinates[:, :2])
+        roi_area = shapely.geometry.Polygon(world_to_image_batch(sensor_model, world_coordinates))
+
+        # The full image is an axis-aligned rectangle so the ROI bounds alone settle the common cases without a
+        # GEOS overlay: an ROI whose bounds lie outside the image can't overlap it and one whose bounds lie inside
+        # the image is entirely contained by it. Only an ROI that crosses the image boundary needs to be clipped.
+        min_x, min_y, max_x, max_y = roi_area.bounds
+        if min_x > ds.RasterXSize or min_y > ds.RasterYSize or max_x < 0 or max_y < 0:
+            area_bounds = None
+        elif min_x >= 0 and min_y >= 0 and max_x <= ds.RasterXSize and max_y <= ds.RasterYSize:
+            area_bounds = roi_area.bounds
+        else:
+            # The intersection is empty exactly when the shapes do not intersect so test it directly rather than
+            # running a separate intersects predicate that builds the same GEOS topology graph
+            area_to_process = roi_area.intersection(shapely.geometry.box(0, 0, ds.RasterXSize, ds.RasterYSize))
+            area_bounds = None if area_to_process.is_empty else area_to_process.bounds
 
+        if area_bounds is not None:
             # Shapely bounds are (minx, miny, maxx, maxy); convert this to the ((r, c), (w, h))
             # expected by the tiler
-            processing_bounds = (
-                (round(area_to_process.bounds[1]), round(area_to_process.bounds[0])),
-                (
-                    round(area_to_process.bounds[2] - area_to_process.bounds[0]),
-                    round(area_to_process.bounds[3] - area_to_process.bounds[1]),
-                ),
-            )
+            min_x, min_y, max_x, max_y = area_bounds
+            processing_bounds = ((round(min_y), round(min_x)), (round(max_x - min_x), round(max_y - min_y)))
         else:
             processing_bounds = None
 
@@ -187,11 +322,8 @@ def get_source_property(image_location: str, image_extension: str, dataset: gdal
             data_type = metadata.get("NITF_ICAT", None)
             source_id = metadata.get("NITF_FTITLE", None)
             # Format of datetime string follows 14 digit spec in MIL-STD-2500C for NITFs
-            source_dt = (
-                datetime.strptime(metadata.get("NITF_IDATIM"), "%Y%m%d%H%M%S").isoformat(timespec="seconds") + "Z"
-                if metadata.get("NITF_IDATIM")
-                else None
-            )
+            idatim = metadata.get("NITF_IDATIM")
+            source_dt = _parse_nitf_idatim(idatim).isoformat(timespec="seconds") + "Z" if idatim else None
 
             # Build a source property for features
             source_property = {
@@ -215,6 +347,24 @@ def get_source_property(image_location: str, image_extension: str, dataset: gdal
         return None
 
 
+def _parse_nitf_idatim(idatim: str) -> datetime:
+    """
+    Parse a NITF image date and time (IDATIM) field. The field is fixed width so the components are sliced out
+    directly, which is considerably faster than interpreting a format string with datetime.strptime.
+
+    :param idatim: the 14 digit CCYYMMDDhhmmss date and time string
+
+    :return: the parsed datetime
+
+    :raises: ValueError = Indicates the field is not a valid date and time
+    """
+    if len(idatim) != 14 or not idatim.isdigit():
+        raise ValueError(f"Invalid NITF IDATIM value: {idatim}")
+    return datetime(
+        int(idatim[0:4]), int(idatim[4:6]), int(idatim[6:8]), int(idatim[8:10]), int(idatim[10:12]), int(idatim[12:14])
+    )
+
+
 def get_extents(ds: gdal.Dataset, sm: SensorModel) -> Dict[str, Any]:
     """
     Returns the geographic extents of the given GDAL dataset.
@@ -224,25 +374,18 @@ def get_extents(ds: gdal.Dataset, sm: SensorModel) -> Dict[str, Any]:
     :return: Dictionary with keys 'north', 'south', 'east', 'west' representing the extents.
     """
     # Compute WGS-84 world coordinates for each image corners to impute the extents for visualizations
-    image_corners = [[0, 0], [ds.RasterXSize, 0], [ds.RasterXSize, ds.RasterYSize], [0, ds.RasterYSize]]
-    geo_image_corners = [sm.image_to_world(ImageCoordinate(corner)) for corner in image_corners]
-    locations = [(degrees(p.latitude), degrees(p.longitude)) for p in geo_image_corners]
-    feature_bounds = functools.reduce(
-        lambda prev, f: [
-            min(f[0], prev[0]),
-            min(f[1], prev[1]),
-            max(f[0], prev[2]),
-            max(f[1], prev[3]),
-        ],
-        locations,
-        [math.inf, math.inf, -math.inf, -math.inf],
+    image_corners = np.array(
+        [[0, 0], [ds.RasterXSize, 0], [ds.RasterXSize, ds.RasterYSize], [0, ds.RasterYSize]], dtype=np.float64
     )
+    locations = np.degrees(image_to_world_batch(sm, image_corners)[:, :2])
+    min_longitude, min_latitude = locations.min(axis=0)
+    max_longitude, max_latitude = locations.max(axis=0)
 
     return {
-        "north": feature_bounds[2],
-        "south": feature_bounds[0],
-        "east": feature_bounds[3],
-        "west": feature_bounds[1],
+        "north": float(max_latitude),
+        "south": float(min_latitude),
+        "east": float(max_longitude),
+        "west": float(min_longitude),
     }
 
 
@@ -256,50 +399,26 @@ def add_properties_to_features(job_id: str, feature_properties: str, features: L
     :return: List[geojson.Feature] = updated list of features
     """
     try:
-        feature_properties: List[dict] = json.loads(feature_properties)
+        # Merge the custom provided feature properties once so each feature needs a single update. Later
+        # dictionaries take precedence over earlier ones just as they would if applied one at a time.
+        custom_properties: Dict[str, Any] = {}
+        for feature_property in json_loads(feature_properties):
+            custom_properties.update(feature_property)
+
         for feature in features:
-            # Update the features with their inference metadata
-            feature["properties"].update(get_inference_metadata_property(job_id, feature["properties"]["inferenceTime"]))
+            properties = feature["properties"]
 
-            # For the custom provided feature properties, update
-            for feature_property in feature_properties:
-                feature["properties"].update(feature_property)
+            # Update the features with their inference metadata. Each feature needs its own metadata dictionary,
+            # but it is assigned directly rather than built inside a wrapper dictionary that is merged in.
+            properties["inferenceMetadata"] = {"jobId": job_id, "inferenceDT": properties["inferenceTime"]}
+            properties.update(custom_properties)
 
             # Remove unneeded feature properties if they are present
-            if feature.get("properties", {}).get("inferenceTime"):
-                del feature["properties"]["inferenceTime"]
-            if feature.get("properties", {}).get(GeojsonDetectionField.BOUNDS):
-                del feature["properties"][GeojsonDetectionField.BOUNDS]
-            if feature.get("properties", {}).get(GeojsonDetectionField.GEOM):
-                del feature["properties"][GeojsonDetectionField.GEOM]
-            if feature.get("properties", {}).get("detection_score"):
-                del feature["properties"]["detection_score"]
-            if feature.get("properties", {}).get("feature_types"):
-                del feature["properties"]["feature_types"]
-            if feature.get("properties", {}).get("image_id"):
-                del feature["properties"]["image_id"]
-            if feature.get("properties", {}).get("adjusted_feature_types"):
-                del feature["properties"]["adjusted_feature_types"]
+            for unneeded_property in UNNEEDED_FEATURE_PROPERTIES:
+                properties.pop(unneeded_property, None)
 
     except Exception as err:
         logging.exception(err)
         raise InvalidFeaturePropertiesException("Could not apply custom properties to features!")
     return features
 
-
-def get_inference_metadata_property(job_id: str, inference_time: str) -> Dict[str, Any]:
-    """
-    Create an inference dictionary property to append to geojson features
-
-    :param job_id: str = unique identifier for the job
-    :param inference_time: str = the time the inference was made in epoch millisec
-
-    :return: Dict[str, Any] = an inference metadata dictionary property to attach to features
-    """
-    inference_metadata_property = {
-        "inferenceMetadata": {
-            "jobId": job_id,
-            "inferenceDT": inference_time,
-        }
-    }
-    return inference_metadata_property
@@ -1,29 +1,99 @@
 #  Copyright 2023-2024 Amazon.com, Inc. or its affiliates.
 
+import copy
 import logging
+import random
+import threading
+import time
 from io import BufferedReader
 from json import JSONDecodeError
-from typing import Optional
+from typing import Any, Dict, Optional
 
-import geojson
 import urllib3
 from aws_embedded_metrics.logger.metrics_logger import MetricsLogger
-from aws_embedded_metrics.metric_scope import metric_scope
 from aws_embedded_metrics.unit import Unit
-from geojson import FeatureCollection
 from requests.exceptions import RetryError
-from urllib3.exceptions import MaxRetryError
+from urllib3.exceptions import InsecureRequestWarning, MaxRetryError
 from urllib3.util.retry import Retry
 
 from aws.osml.model_runner.api import ModelInvokeMode
-from aws.osml.model_runner.app_config import MetricLabels
-from aws.osml.model_runner.common import Timer
+from aws.osml.model_runner.app_config import MetricLabels, ServiceConfig
+from aws.osml.model_runner.common import Timer, metric_scope
 
-from .detector import Detector
+from .detector import Detector, normalize_feature_properties
 from .endpoint_builder import FeatureEndpointBuilder
 
+# orjson is an optional dependency that parses JSON several times faster than the standard library. Both accept
+# the raw bytes of the response body so it never needs to be decoded to a str first.
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 logger = logging.getLogger(__name__)
 
+# A single connection pool manager is shared by all detectors so the tile workers reuse open (keep-alive)
+# connections to the model endpoints; it is created the first time it is needed
+_http_pool: Optional[urllib3.PoolManager] = None
+_http_pool_lock = threading.Lock()
+
+# Response codes a model endpoint returns when it is overloaded or temporarily unavailable. A 500 is deliberately
+# excluded; it usually means the model failed on this tile's content and would fail again on every retry.
+MODEL_RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+
+def _get_http_pool() -> urllib3.PoolManager:
+    """
+    Get the connection pool manager shared by all HTTP detectors, creating it if needed. Each host's pool keeps up
+    to one connection per tile worker so concurrent invocations don't have to open new connections. Retry policies
+    are applied per request so detectors with different policies can share the pools. TLS certificates are verified
+    unless ServiceConfig.insecure_http_detector is set.
+
+    :return: the shared pool manager
+    """
+    global _http_pool
+    with _http_pool_lock:
+        if _http_pool is None:
+            if ServiceConfig.insecure_http_detector:
+                # Verification was explicitly turned off so silence the warning urllib3 would otherwise raise and
+                # filter on every request
+                urllib3.disable_warnings(InsecureRequestWarning)
+                cert_reqs = "CERT_NONE"
+            else:
+                cert_reqs = "CERT_REQUIRED"
+            _http_pool = urllib3.PoolManager(cert_reqs=cert_reqs, maxsize=int(ServiceConfig.workers), block=False)
+        return _http_pool
+
+
+# urllib3 rejects timeouts that are not positive so an attempt made once the deadline has passed is given this long
+MIN_ATTEMPT_TIMEOUT = 0.001
+
+
+class DeadlineTimeout(urllib3.Timeout):
+    """
+    A Timeout that limits every attempt of a request to the time remaining before a deadline. urllib3 clones the
+    timeout at the start of each attempt (including retries) so the remaining time is computed in clone rather than
+    once when the request is made.
+    """
+
+    def __init__(self, deadline: float):
+        """
+        Initializes the DeadlineTimeout with the time remaining before the deadline.
+
+        :param deadline: float = A time.monotonic() value by which each attempt must complete.
+        :return: None
+        """
+        super(DeadlineTimeout, self).__init__(total=max(MIN_ATTEMPT_TIMEOUT, deadline - time.monotonic()))
+        self.deadline = deadline
+
+    def clone(self) -> "DeadlineTimeout":
+        """
+        Creates the timeout for a new attempt, bounded by the time remaining before the deadline.
+
+        :return: DeadlineTimeout = The timeout to use for the attempt.
+        """
+        return DeadlineTimeout(self.deadline)
+
 
 class CountingRetry(urllib3.Retry):
     """
@@ -31,14 +101,37 @@ class CountingRetry(urllib3.Retry):
     Inherits from urllib3's Retry class to implement retry logic with an additional retry count.
     """
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, deadline: Optional[float] = None, **kwargs):
         """
         Initializes the CountingRetry class with retry settings.
 
+        :param deadline: Optional[float] = A time.monotonic() value after which no further retries are attempted.
         :return: None
         """
         super(CountingRetry, self).__init__(*args, **kwargs)
         self.retry_counts = 0
+        self.deadline = deadline
+
+    def new(self, **kw) -> "CountingRetry":
+        """
+        Creates a copy of this policy with the given settings changed, carrying over the deadline unless a new one is
+        provided. urllib3 calls this on every increment so the deadline follows the request through its retries.
+
+        :return: CountingRetry = The new retry policy.
+        """
+        kw.setdefault("deadline", self.deadline)
+        return super(CountingRetry, self).new(**kw)
+
+    def is_exhausted(self) -> bool:
+        """
+        Checks whether the retry budget is spent, either because the retry counts ran out or because the deadline has
+        passed. urllib3 then raises a MaxRetryError instead of retrying again.
+
+        :return: bool = True if no further retries should be attempted.
+        """
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return True
+        return super(CountingRetry, self).is_exhausted()
 
     def increment(self, *args, **kwargs) -> Retry:
         """
@@ -51,10 +144,47 @@ class CountingRetry(urllib3.Retry):
 
         return result
 
+    def get_backoff_time(self) -> float:
+        """
+        Computes the time to sleep before the next retry using "full jitter": a random duration between zero and the
+        exponential backoff urllib3 would otherwise sleep for. Tile workers that fail together against a congested
+        endpoint then spread their retries out instead of retrying in lockstep.
+
+        :return: float = The number of seconds to sleep before retrying.
+        """
+        return self._clamp_to_deadline(random.uniform(0, super(CountingRetry, self).get_backoff_time()))
+
+    def get_retry_after(self, response) -> Optional[float]:
+        """
+        Gets the delay requested by the endpoint's Retry-After header, capped at the policy's maximum backoff so an
+        overloaded endpoint can slow the tile workers down without stalling them indefinitely. Only urllib3 2.x
+        configures the maximum per policy; older releases always use the class default.
+
+        :param response: BaseHTTPResponse = The response that is being retried.
+        :return: Optional[float] = The number of seconds to sleep, or None if the header is not present.
+        """
+        retry_after = super(CountingRetry, self).get_retry_after(response)
+        if retry_after is None:
+            return None
+        return self._clamp_to_deadline(min(retry_after, getattr(self, "backoff_max", Retry.DEFAULT_BACKOFF_MAX)))
+
+    def _clamp_to_deadline(self, delay: float) -> float:
+        """
+        Shortens a delay so that sleeping never carries the request past its deadline.
+
+        :param delay: float = The number of seconds the policy would sleep for.
+        :return: float = The number of seconds to sleep.
+        """
+        if self.deadline is None:
+            return delay
+        return max(0.0, min(delay, self.deadline - time.monotonic()))
+
     @classmethod
     def from_retry(cls, retry_instance: Retry) -> "CountingRetry":
         """
-        Creates a CountingRetry instance from an existing Retry instance.
+        Creates a CountingRetry instance from an existing Retry instance. The instance is shallow copied and its
+        class switched rather than rebuilt field by field, so every setting of the provided policy is carried over
+        (including any added by future urllib3 releases) and the caller's instance is left unchanged.
 
         :param retry_instance: Retry = The Retry instance to convert.
         :return: CountingRetry = A new CountingRetry object with the same configurations as the provided Retry instance.
@@ -62,22 +192,11 @@ class CountingRetry(urllib3.Retry):
         if isinstance(retry_instance, cls):
             return retry_instance
 
-        return cls(
-            total=retry_instance.total,
-            connect=retry_instance.connect,
-            read=retry_instance.read,
-            redirect=retry_instance.redirect,
-            status=retry_instance.status,
-            other=retry_instance.other,
-            allowed_methods=retry_instance.allowed_methods,
-            status_forcelist=retry_instance.status_forcelist,
-            backoff_factor=retry_instance.backoff_factor,
-            raise_on_redirect=retry_instance.raise_on_redirect,
-            raise_on_status=retry_instance.raise_on_status,
-            history=retry_instance.history,
-            respect_retry_after_header=retry_instance.respect_retry_after_header,
-            remove_headers_on_redirect=retry_instance.remove_headers_on_redirect,
-        )
+        counting_retry = copy.copy(retry_instance)
+        counting_retry.__class__ = cls
+        counting_retry.retry_counts = 0
+        counting_retry.deadline = None
+        return counting_retry
 
 
 class HTTPDetector(Detector):
@@ -98,12 +217,23 @@ class HTTPDetector(Detector):
         :param retry: Optional[Retry] = Retry policy for network requests.
         """
         if retry is None:
-            self.retry = CountingRetry(total=8, backoff_factor=1, raise_on_status=True)
+            self.retry = CountingRetry(
+                total=8,
+                backoff_factor=1,
+                raise_on_status=True,
+                status_forcelist=MODEL_RETRY_STATUS_CODES,
+                allowed_methods=frozenset({"POST"}),
+            )
         else:
             self.retry = CountingRetry.from_retry(retry)
-        self.http_pool = urllib3.PoolManager(cert_reqs="CERT_NONE", retries=self.retry)
+        self.http_pool = _get_http_pool()
         self.name = name or "http"
         super().__init__(endpoint=endpoint)
+        # The metric dimensions only depend on the model name so they are built once instead of on every invocation
+        self._metric_dimensions = {
+            MetricLabels.OPERATION_DIMENSION: MetricLabels.MODEL_INVOCATION_OPERATION,
+            MetricLabels.MODEL_NAME_DIMENSION: self.name,
+        }
 
     @property
     def mode(self) -> ModelInvokeMode:
@@ -115,36 +245,29 @@ class HTTPDetector(Detector):
         return ModelInvokeMode.HTTP_ENDPOINT
 
     @metric_scope
-    def find_features(self, payload: BufferedReader, metrics: MetricsLogger) -> FeatureCollection:
+    def find_features(self, payload: BufferedReader, metrics: MetricsLogger) -> Dict[str, Any]:
         """
         Invokes the HTTP model endpoint to detect features from the given payload.
 
         This method sends a payload to the HTTP model endpoint and retrieves feature detection results
-        in the form of a geojson FeatureCollection. If configured, it logs metrics about the invocation process.
+        as a decoded geojson FeatureCollection dictionary. If configured, it logs metrics about the invocation process.
 
         :param payload: BufferedReader = The data to be sent to the HTTP model for feature detection.
         :param metrics: MetricsLogger = The metrics logger to capture system performance and log metrics.
 
-        :return: FeatureCollection = A geojson FeatureCollection containing the detected features.
+        :return: Dict[str, Any] = A geojson FeatureCollection dictionary containing the detected features.
 
         :raises RetryError: Raised if the request fails after retries.
         :raises MaxRetryError: Raised if the maximum retry attempts are reached.
         :raises JSONDecodeError: Raised if there is an error decoding the model's response.
         """
-        logger.debug(f"Invoking Model: {self.name}")
-        if isinstance(metrics, MetricsLogger):
-            metrics.set_dimensions()
-            metrics.put_dimensions(
-                {
-                    MetricLabels.OPERATION_DIMENSION: MetricLabels.MODEL_INVOCATION_OPERATION,
-                    MetricLabels.MODEL_NAME_DIMENSION: self.name,
-                }
-            )
+        logger.debug("Invoking Model: %s", self.name)
+        metrics.set_dimensions()
+        metrics.put_dimensions(self._metric_dimensions)
 
         try:
             self.request_count += 1
-            if isinstance(metrics, MetricsLogger):
-                metrics.put_metric(MetricLabels.INVOCATIONS, 1, str(Unit.COUNT.value))
+            metrics.put_metric(MetricLabels.INVOCATIONS, 1, str(Unit.COUNT.value))
 
             with Timer(
                 task_str="Invoke HTTP Endpoint",
@@ -152,39 +275,41 @@ class HTTPDetector(Detector):
                 logger=logger,
                 metrics_logger=metrics,
             ):
+                # Each invocation gets its own copy of the policy bounded by a wall-clock deadline so a struggling
+                # endpoint can't hold this tile worker for the full exponential retry schedule. The same deadline
+                # bounds the connect and the wait for a response of every attempt so a hung connection is abandoned
+                # once the deadline passes. urllib3 applies the read timeout to each socket read so only an endpoint
+                # that keeps trickling out a response can hold the worker longer.
+                deadline = time.monotonic() + float(ServiceConfig.inference_deadline)
+                retries = self.retry.new(deadline=deadline)
                 response = self.http_pool.request(
                     method="POST",
                     url=self.endpoint,
                     body=payload,
+                    retries=retries,
+                    timeout=DeadlineTimeout(deadline),
                 )
-                retry_count = self.retry.retry_counts
-                if isinstance(metrics, MetricsLogger):
-                    metrics.put_metric(MetricLabels.RETRIES, retry_count, str(Unit.COUNT.value))
+                # urllib3 returns a new Retry object from every increment so the count is read from the policy
+                # attached to the final response rather than from the detector's own (never incremented) policy
+                retry_count = getattr(response.retries, "retry_counts", 0)
+                metrics.put_metric(MetricLabels.RETRIES, retry_count, str(Unit.COUNT.value))
 
-                return geojson.loads(response.data.decode("utf-8"))
+                return normalize_feature_properties(json_loads(response.data))
 
+        # Errors are re-raised to the tile worker which logs them with their traceback so only a summary is logged here
         except RetryError as err:
-            if isinstance(metrics, MetricsLogger):
-                metrics.put_metric(MetricLabels.ERRORS, 1, str(Unit.COUNT.value))
-            logger.error(f"Retry failed - failed due to {err}")
-            logger.exception(err)
+            metrics.put_metric(MetricLabels.ERRORS, 1, str(Unit.COUNT.value))
+            logger.error("Retry failed - failed due to %s", err)
             raise err
         except MaxRetryError as err:
-            if isinstance(metrics, MetricsLogger):
-                metrics.put_metric(MetricLabels.ERRORS, 1, str(Unit.COUNT.value))
-            logger.error(f"Max retries reached - failed due to {err.reason}")
-            logger.exception(err)
+            metrics.put_metric(MetricLabels.ERRORS, 1, str(Unit.COUNT.value))
+            logger.error("Max retries reached - failed due to %s", err.reason)
             raise err
         except JSONDecodeError as err:
-            if isinstance(metrics, MetricsLogger):
-                metrics.put_metric(MetricLabels.ERRORS, 1, str(Unit.COUNT.value))
-            logger.error(
-                (
-                    f"Unable to decode response from model. URL: {self.endpoint}, Status: {response.status}, "
-                    f"Headers: {response.info()}, Response: {response.data}"
-                )
-            )
-            logger.exception(err)
+            metrics.put_metric(MetricLabels.ERRORS, 1, str(Unit.COUNT.value))
+            logger.error("Unable to decode response from model. URL: %s, Status: %s", self.endpoint, response.status)
+            # The response body can be several MB so it is only rendered when debug logging is enabled
+            logger.debug("Undecodable model response. Headers: %s, Response: %s", response.headers, response.data)
             raise err
 
 
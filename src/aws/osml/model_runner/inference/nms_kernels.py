@@ -0,0 +1,375 @@
+#  Copyright 2023-2024 Amazon.com, Inc. or its affiliates.
+
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+# NumExpr is an optional dependency (pip install osml-model-runner[numexpr]). Its multithreaded virtual machine can
+# evaluate the dense IoU matrix in a single pass without the intermediate arrays NumPy allocates. Broadcasting in
+# NumExpr is much slower per core than in NumPy so it only pays off on hosts with many cores; set NMS_USE_NUMEXPR=True
+# to opt in.
+try:
+    import numexpr as ne
+
+    NUMEXPR_AVAILABLE = True
+except ImportError:
+    NUMEXPR_AVAILABLE = False
+USE_NUMEXPR = NUMEXPR_AVAILABLE and os.getenv("NMS_USE_NUMEXPR", "False").lower() == "true"
+
+# Below this many boxes the dense IoU matrix used by Cluster-NMS comfortably fits in memory
+CLUSTER_NMS_MAX_BOXES = 4096
+
+# The spatial hash used to find overlapping boxes sizes its cells to this percentile of the box dimensions, but never
+# uses more than this many cells along either axis so a single very large box can only span a bounded number of cells
+OVERLAP_CELL_SIZE_PERCENTILE = 95
+OVERLAP_MAX_GRID_CELLS = 256
+
+# Below this many boxes the cost of starting NumExpr outweighs the time saved evaluating the IoU matrix
+NUMEXPR_MIN_BOXES = 256
+
+# NumExpr expression for the IoU of every pair of boxes i and j, evaluated with broadcasting in a single pass that
+# never stores the intersections. Only where() is used for the minimum and maximum so it works with all releases.
+_NUMEXPR_WIDTH = "(where(x2i < x2j, x2i, x2j) - where(x1i > x1j, x1i, x1j))"
+_NUMEXPR_HEIGHT = "(where(y2i < y2j, y2i, y2j) - where(y1i > y1j, y1i, y1j))"
+_NUMEXPR_INTERSECTION = (
+    f"(where({_NUMEXPR_WIDTH} > 0, {_NUMEXPR_WIDTH}, 0) * where({_NUMEXPR_HEIGHT} > 0, {_NUMEXPR_HEIGHT}, 0))"
+)
+_NUMEXPR_IOU = f"{_NUMEXPR_INTERSECTION} / (ai + aj - {_NUMEXPR_INTERSECTION})"
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_thr: float, areas: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Run NMS using the best available implementation for the number of boxes provided. Exact (greedy) NMS results
+    are computed with Cluster-NMS; very large sets only compare boxes that are close enough to overlap instead of
+    building the full IoU matrix.
+
+    :param boxes: (N, 4) array of [x1, y1, x2, y2] bounding boxes
+    :param scores: (N,) array of confidence scores
+    :param iou_thr: boxes overlapping a higher scoring box by more than this value are suppressed
+    :param areas: optional (N,) array of precomputed box areas, see box_areas
+    :return: indexes of the boxes to keep, ordered by descending score
+    """
+    if len(boxes) < CLUSTER_NMS_MAX_BOXES:
+        return cluster_nms(boxes, scores, iou_thr, areas=areas)
+    return cluster_nms_sparse(boxes, scores, iou_thr, areas=areas)
+
+
+# At or above this many boxes Soft-NMS only rescores the neighbors of each selected box (ASAP-NMS)
+SOFT_NMS_SPARSE_MIN_BOXES = 2048
+
+
+def soft_nms(
+    boxes: np.ndarray, scores: np.ndarray, sigma: float, thresh: float, areas: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Run Gaussian Soft-NMS using the best implementation for the number of boxes provided.
+
+    :param boxes: (N, 4) array of [x1, y1, x2, y2] bounding boxes
+    :param scores: (N,) array of confidence scores
+    :param sigma: the Gaussian penalty parameter
+    :param thresh: boxes whose decayed score falls to or below this value are discarded
+    :param areas: optional (N,) array of precomputed box areas, see box_areas
+    :return: tuple of the indexes of the selected boxes and their decayed scores, ordered by selection
+    """
+    if len(boxes) >= SOFT_NMS_SPARSE_MIN_BOXES:
+        return soft_nms_asap(boxes, scores, sigma, thresh, areas=areas)
+    return soft_nms_numpy(boxes, scores, sigma, thresh, areas=areas)
+
+
+def box_areas(boxes: np.ndarray) -> np.ndarray:
+    """
+    Compute the area of every bounding box. All of the kernels in this module accept these as an optional argument
+    so callers can compute them once and share them across every IoU computation made on the same boxes.
+
+    :param boxes: (N, 4) array of [x1, y1, x2, y2] bounding boxes
+    :return: (N,) array of box areas
+    """
+    return (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+
+
+def offset_boxes_by_label(boxes: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """
+    Shifts each bounding box by an amount proportional to its label so that boxes with different labels can never
+    overlap. This allows a single class-agnostic NMS pass to produce the same result as running NMS separately for
+    each label (the "coordinate trick" used by torchvision's batched_nms). The boxes are first translated so the
+    smallest coordinate is zero and then shifted by multiples of the coordinate span. The shift is always made in
+    float64: with a full-scene span and a few hundred labels the shifted coordinates reach the millions, where a
+    float32 can no longer represent the fractional widths of padded point boxes and they would collapse to zero.
+
+    :param boxes: (N, 4) array of [x1, y1, x2, y2] bounding boxes, left unchanged
+    :param labels: (N,) array of integer label ids
+    :return: (N, 4) float64 array of the shifted boxes
+    """
+    shifted = boxes.astype(np.float64)
+    if len(shifted) == 0:
+        return shifted
+    min_coord = shifted.min()
+    shifted += (labels * (shifted.max() - min_coord + 1) - min_coord)[:, None]
+    return shifted
+
+
+def cluster_nms(
+    boxes: np.ndarray, scores: np.ndarray, iou_thr: float, max_iter: int = 200, areas: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Cluster-NMS as described in https://arxiv.org/abs/2005.03572. The boxes are sorted by score and a single upper
+    triangular IoU matrix is computed, which is then repeatedly masked so that only boxes still kept can suppress
+    others. The iteration converges to exactly the same result as greedy NMS, usually within a handful of matrix
+    passes.
+
+    :param boxes: (N, 4) array of [x1, y1, x2, y2] bounding boxes
+    :param scores: (N,) array of confidence scores
+    :param iou_thr: boxes overlapping a higher scoring box by more than this value are suppressed
+    :param max_iter: upper bound on the number of iterations
+    :param areas: optional (N,) array of precomputed box areas, see box_areas
+    :return: indexes of the boxes to keep, ordered by descending score
+    """
+    if areas is None:
+        areas = box_areas(boxes)
+    order = np.argsort(-scores, kind="stable")
+    iou = _upper_iou_matrix(boxes[order], areas[order])
+    keep = np.ones(len(order), dtype=bool)
+    for _ in range(max_iter):
+        new_keep = (iou * keep[:, None]).max(axis=0) <= iou_thr
+        if np.array_equal(new_keep, keep):
+            break
+        keep = new_keep
+    return order[keep]
+
+
+def cluster_nms_sparse(
+    boxes: np.ndarray, scores: np.ndarray, iou_thr: float, max_iter: int = 200, areas: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Cluster-NMS computed over the sparse set of box pairs that can actually overlap. Boxes are bucketed by a
+    spatial hash (see _overlapping_pairs) and the IoU is only computed for boxes that share a bucket, so for
+    scenes where the boxes are spread across the image the work grows linearly with the number of boxes rather
+    than quadratically. The result is identical to cluster_nms.
+
+    :param boxes: (N, 4) array of [x1, y1, x2, y2] bounding boxes
+    :param scores: (N,) array of confidence scores
+    :param iou_thr: boxes overlapping a higher scoring box by more than this value are suppressed
+    :param max_iter: upper bound on the number of iterations
+    :param areas: optional (N,) array of precomputed box areas, see box_areas
+    :return: indexes of the boxes to keep, ordered by descending score
+    """
+    if areas is None:
+        areas = box_areas(boxes)
+    order = np.argsort(-scores, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+
+    # Only the higher scoring box of each pair can suppress the other one
+    rows, cols = _overlapping_pairs(boxes)
+    higher = rank[rows] < rank[cols]
+    rows, cols = rows[higher], cols[higher]
+    suppresses = _pairwise_iou(boxes, areas, rows, cols) > iou_thr
+    rows, cols = rank[rows[suppresses]], rank[cols[suppresses]]
+
+    keep = np.ones(len(order), dtype=bool)
+    for _ in range(max_iter):
+        new_keep = np.ones(len(order), dtype=bool)
+        new_keep[cols[keep[rows]]] = False
+        if np.array_equal(new_keep, keep):
+            break
+        keep = new_keep
+    return order[keep]
+
+
+def _upper_iou_matrix(boxes: np.ndarray, areas: np.ndarray) -> np.ndarray:
+    """
+    Compute the pairwise IoU of every box with every other box keeping only the entries above the diagonal, i.e.
+    element [i, j] is the IoU of box i with box j for i < j and zero otherwise.
+
+    :param boxes: (N, 4) array of [x1, y1, x2, y2] bounding boxes
+    :param areas: (N,) array of box areas
+    :return: (N, N) upper triangular IoU matrix
+    """
+    x1, y1, x2, y2 = boxes.T
+    if USE_NUMEXPR and len(boxes) >= NUMEXPR_MIN_BOXES:
+        iou = ne.evaluate(
+            _NUMEXPR_IOU,
+            local_dict={
+                "x1i": x1[:, None],
+                "y1i": y1[:, None],
+                "x2i": x2[:, None],
+                "y2i": y2[:, None],
+                "x1j": x1[None, :],
+                "y1j": y1[None, :],
+                "x2j": x2[None, :],
+                "y2j": y2[None, :],
+                "ai": areas[:, None],
+                "aj": areas[None, :],
+            },
+        )
+        return np.triu(iou, 1)
+
+    xx1 = np.maximum(x1[:, None], x1[None, :])
+    yy1 = np.maximum(y1[:, None], y1[None, :])
+    xx2 = np.minimum(x2[:, None], x2[None, :])
+    yy2 = np.minimum(y2[:, None], y2[None, :])
+    inter = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+    return np.triu(inter / (areas[:, None] + areas[None, :] - inter), 1)
+
+
+def _overlapping_pairs(boxes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find candidate pairs of boxes that may overlap using a spatial hash. Each box is inserted into every grid cell
+    its extent touches, so any two overlapping boxes share at least one cell, and only boxes sharing a cell are
+    paired. The cell size follows the typical box size rather than the largest one so a few very large boxes only
+    add pairs for the cells they cover instead of forcing every box into the same cell.
+
+    :param boxes: (N, 4) array of [x1, y1, x2, y2] bounding boxes
+    :return: tuple of row and column indexes for each candidate pair, both orderings of every pair are included
+    """
+    x1, y1, x2, y2 = boxes.T
+    min_x, min_y = float(x1.min()), float(y1.min())
+    span = max(float(x2.max()) - min_x, float(y2.max()) - min_y)
+    cell_size = max(
+        float(np.percentile(np.maximum(x2 - x1, y2 - y1), OVERLAP_CELL_SIZE_PERCENTILE)), span / OVERLAP_MAX_GRID_CELLS
+    )
+    if cell_size <= 0:
+        cell_size = 1.0
+    first_x = np.floor((x1 - min_x) / cell_size).astype(np.int64)
+    first_y = np.floor((y1 - min_y) / cell_size).astype(np.int64)
+    cells_x = np.floor((x2 - min_x) / cell_size).astype(np.int64) - first_x + 1
+    cells_y = np.floor((y2 - min_y) / cell_size).astype(np.int64) - first_y + 1
+    grid_height = int((first_y + cells_y).max()) + 1
+
+    # Expand each box into one entry for every cell it covers
+    cell_counts = cells_x * cells_y
+    entry_boxes = np.repeat(np.arange(len(boxes)), cell_counts)
+    local = np.arange(int(cell_counts.sum())) - np.repeat(np.cumsum(cell_counts) - cell_counts, cell_counts)
+    entry_keys = (first_x[entry_boxes] + local // cells_y[entry_boxes]) * grid_height + (
+        first_y[entry_boxes] + local % cells_y[entry_boxes]
+    )
+
+    # Pair every entry with every other entry in the same cell
+    order = np.argsort(entry_keys, kind="stable")
+    sorted_keys = entry_keys[order]
+    starts = np.searchsorted(sorted_keys, entry_keys, side="left")
+    counts = np.searchsorted(sorted_keys, entry_keys, side="right") - starts
+    offsets = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    rows = np.repeat(entry_boxes, counts)
+    cols = entry_boxes[order[np.repeat(starts, counts) + offsets]]
+
+    # Boxes spanning several cells may share more than one of them so drop the repeated pairs
+    distinct = rows != cols
+    pairs = np.unique(rows[distinct] * len(boxes) + cols[distinct])
+    return pairs // len(boxes), pairs % len(boxes)
+
+
+def _pairwise_iou(boxes: np.ndarray, areas: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """
+    Compute the IoU for each of the given pairs of boxes.
+
+    :param boxes: (N, 4) array of [x1, y1, x2, y2] bounding boxes
+    :param areas: (N,) array of box areas
+    :param rows: indexes of the first box in each pair
+    :param cols: indexes of the second box in each pair
+    :return: the IoU of each pair
+    """
+    x1, y1, x2, y2 = boxes.T
+    inter = np.clip(np.minimum(x2[rows], x2[cols]) - np.maximum(x1[rows], x1[cols]), 0, None) * np.clip(
+        np.minimum(y2[rows], y2[cols]) - np.maximum(y1[rows], y1[cols]), 0, None
+    )
+    return inter / (areas[rows] + areas[cols] - inter)
+
+
+def soft_nms_numpy(
+    boxes: np.ndarray, scores: np.ndarray, sigma: float, thresh: float, areas: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Gaussian Soft-NMS (https://arxiv.org/abs/1704.04503). On each iteration the highest scoring remaining box is
+    selected and the scores of all other boxes are decayed by exp(-IoU^2 / sigma) in a single vectorized update.
+    Boxes are dropped from the working set as soon as their score falls to or below the threshold.
+
+    :param boxes: (N, 4) array of [x1, y1, x2, y2] bounding boxes
+    :param scores: (N,) array of confidence scores
+    :param sigma: the Gaussian penalty parameter
+    :param thresh: boxes whose decayed score falls to or below this value are discarded
+    :param areas: optional (N,) array of precomputed box areas, see box_areas
+    :return: tuple of the indexes of the selected boxes and their decayed scores, ordered by selection
+    """
+    if areas is None:
+        areas = box_areas(boxes)
+    indices = np.flatnonzero(scores > thresh)
+    x1, y1, x2, y2 = boxes[indices].T
+    areas = areas[indices]
+    scores = scores[indices]
+
+    keep = []
+    keep_scores = []
+    while indices.size > 0:
+        i = int(np.argmax(scores))
+        keep.append(indices[i])
+        keep_scores.append(scores[i])
+
+        xx1 = np.maximum(x1[i], x1)
+        yy1 = np.maximum(y1[i], y1)
+        xx2 = np.minimum(x2[i], x2)
+        yy2 = np.minimum(y2[i], y2)
+        inter = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+        iou = inter / (areas[i] + areas - inter)
+        scores = scores * np.exp(-(iou**2) / sigma)
+
+        remaining = scores > thresh
+        remaining[i] = False
+        indices, x1, y1, x2, y2, areas, scores = (values[remaining] for values in (indices, x1, y1, x2, y2, areas, scores))
+
+    return np.asarray(keep, dtype=np.int64), np.asarray(keep_scores, dtype=np.float64)
+
+
+def soft_nms_asap(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    sigma: float,
+    thresh: float,
+    iou_floor: float = 0.05,
+    areas: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Gaussian Soft-NMS using the sparse "template" approach of ASAP-NMS (https://arxiv.org/abs/2007.09785). The
+    neighbors of every box, i.e. the boxes it overlaps with an IoU above iou_floor, are found once along with the
+    Gaussian penalty for each pair. Each iteration then only rescores the neighbors of the selected box instead of
+    every remaining box. Overlaps below the floor are treated as no overlap; with the default floor that ignores
+    penalties of less than exp(-0.0025 / sigma).
+
+    :param boxes: (N, 4) array of [x1, y1, x2, y2] bounding boxes
+    :param scores: (N,) array of confidence scores
+    :param sigma: the Gaussian penalty parameter
+    :param thresh: boxes whose decayed score falls to or below this value are discarded
+    :param iou_floor: pairs of boxes overlapping by this IoU or less do not affect each other
+    :param areas: optional (N,) array of precomputed box areas, see box_areas
+    :return: tuple of the indexes of the selected boxes and their decayed scores, ordered by selection
+    """
+    if areas is None:
+        areas = box_areas(boxes)
+    rows, cols = _overlapping_pairs(boxes)
+    iou = _pairwise_iou(boxes, areas, rows, cols)
+    neighbors = iou > iou_floor
+    penalties = csr_matrix(
+        (np.exp(-(iou[neighbors] ** 2) / sigma), (rows[neighbors], cols[neighbors])), shape=(len(boxes), len(boxes))
+    )
+
+    scores = scores.astype(np.float64, copy=True)
+    scores[scores <= thresh] = -np.inf
+
+    keep = []
+    keep_scores = []
+    while True:
+        i = int(np.argmax(scores))
+        if scores[i] <= thresh:
+            break
+        keep.append(i)
+        keep_scores.append(scores[i])
+        scores[i] = -np.inf
+
+        start, end = penalties.indptr[i], penalties.indptr[i + 1]
+        neighbor_indices = penalties.indices[start:end]
+        live = scores[neighbor_indices] > thresh
+        scores[neighbor_indices[live]] *= penalties.data[start:end][live]
+
+    return np.asarray(keep, dtype=np.int64), np.asarray(keep_scores, dtype=np.float64)
@@ -1,27 +1,82 @@
 #  Copyright 2023-2024 Amazon.com, Inc. or its affiliates.
 
 import logging
+import threading
+from functools import lru_cache
 from io import BufferedReader
 from json import JSONDecodeError
-from typing import Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 import boto3
-import geojson
 from aws_embedded_metrics.logger.metrics_logger import MetricsLogger
-from aws_embedded_metrics.metric_scope import metric_scope
 from aws_embedded_metrics.unit import Unit
+from botocore.client import BaseClient
 from botocore.exceptions import ClientError
-from geojson import FeatureCollection
 
 from aws.osml.model_runner.api import ModelInvokeMode
 from aws.osml.model_runner.app_config import BotoConfig, MetricLabels
-from aws.osml.model_runner.common import Timer
+from aws.osml.model_runner.common import Timer, metric_scope
 
-from .detector import Detector
+from .detector import Detector, normalize_feature_properties
 from .endpoint_builder import FeatureEndpointBuilder
 
+# orjson is an optional dependency that parses JSON several times faster than the standard library. Both accept
+# the raw bytes of the response body so it never needs to be decoded to a str first.
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 logger = logging.getLogger(__name__)
 
+# SageMaker runtime clients are thread safe but expensive to create so detectors that invoke endpoints with the same
+# credentials share one client and its connection pool. Assumed role credentials are rotated so only the most
+# recently used clients are kept.
+SM_CLIENT_CACHE_SIZE = 16
+_sm_client_lock = threading.Lock()
+
+
+def _get_sm_client(assumed_credentials: Optional[Dict[str, str]] = None) -> BaseClient:
+    """
+    Get a SageMaker runtime client for the given credentials, reusing a cached client when one exists. Clients are
+    created under a lock since creating clients from the default boto3 session is not thread safe.
+
+    :param assumed_credentials: Optional credentials to create the client with, the container role is used if None
+    :return: the SageMaker runtime client
+    """
+    credentials = None
+    if assumed_credentials is not None:
+        credentials = (
+            assumed_credentials.get("AccessKeyId"),
+            assumed_credentials.get("SecretAccessKey"),
+            assumed_credentials.get("SessionToken"),
+        )
+    with _sm_client_lock:
+        return _create_sm_client(credentials)
+
+
+@lru_cache(maxsize=SM_CLIENT_CACHE_SIZE)
+def _create_sm_client(credentials: Optional[Tuple[str, str, str]]) -> BaseClient:
+    """
+    Create a SageMaker runtime client, see _get_sm_client.
+
+    :param credentials: Optional access key id, secret access key, and session token to create the client with
+    :return: the SageMaker runtime client
+    """
+    if credentials is not None:
+        # Use the provided credentials to invoke SageMaker endpoints in another AWS account.
+        access_key_id, secret_access_key, session_token = credentials
+        return boto3.client(
+            "sagemaker-runtime",
+            config=BotoConfig.sagemaker,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            aws_session_token=session_token,
+        )
+
+    # Use the default role for this container if no specific credentials are provided.
+    return boto3.client("sagemaker-runtime", config=BotoConfig.sagemaker)
+
 
 class SMDetector(Detector):
     """
@@ -39,19 +94,13 @@ class SMDetector(Detector):
         :param endpoint: str = The name of the SageMaker endpoint to invoke.
         :param assumed_credentials: Dict[str, str] = Optional credentials for invoking the SageMaker model.
         """
-        if assumed_credentials is not None:
-            # Use the provided credentials to invoke SageMaker endpoints in another AWS account.
-            self.sm_client = boto3.client(
-                "sagemaker-runtime",
-                config=BotoConfig.sagemaker,
-                aws_access_key_id=assumed_credentials.get("AccessKeyId"),
-                aws_secret_access_key=assumed_credentials.get("SecretAccessKey"),
-                aws_session_token=assumed_credentials.get("SessionToken"),
-            )
-        else:
-            # Use the default role for this container if no specific credentials are provided.
-            self.sm_client = boto3.client("sagemaker-runtime", config=BotoConfig.sagemaker)
+        self.sm_client = _get_sm_client(assumed_credentials)
         super().__init__(endpoint=endpoint)
+        # The metric dimensions only depend on the endpoint so they are built once instead of on every invocation
+        self._metric_dimensions = {
+            MetricLabels.OPERATION_DIMENSION: MetricLabels.MODEL_INVOCATION_OPERATION,
+            MetricLabels.MODEL_NAME_DIMENSION: self.endpoint,
+        }
 
     @property
     def mode(self) -> ModelInvokeMode:
@@ -63,35 +112,28 @@ class SMDetector(Detector):
         return ModelInvokeMode.SM_ENDPOINT
 
     @metric_scope
-    def find_features(self, payload: BufferedReader, metrics: MetricsLogger) -> FeatureCollection:
+    def find_features(self, payload: BufferedReader, metrics: MetricsLogger) -> Dict[str, Any]:
         """
         Invokes the SageMaker model endpoint to detect features from the given payload.
 
         This method sends a payload to the SageMaker model endpoint and retrieves feature detection results
-        in the form of a geojson FeatureCollection. If configured, it logs metrics about the invocation process.
+        as a decoded geojson FeatureCollection dictionary. If configured, it logs metrics about the invocation process.
 
         :param payload: BufferedReader = The data to be sent to the SageMaker model for feature detection.
         :param metrics: MetricsLogger = The metrics logger to capture system performance and log metrics.
 
-        :return: FeatureCollection = A geojson FeatureCollection containing the detected features.
+        :return: Dict[str, Any] = A geojson FeatureCollection dictionary containing the detected features.
 
         :raises ClientError: Raised if there is an error while invoking the SageMaker endpoint.
         :raises JSONDecodeError: Raised if there is an error decoding the model's response.
         """
-        logger.debug(f"Invoking Model: {self.endpoint}")
-        if isinstance(metrics, MetricsLogger):
-            metrics.set_dimensions()
-            metrics.put_dimensions(
-                {
-                    MetricLabels.OPERATION_DIMENSION: MetricLabels.MODEL_INVOCATION_OPERATION,
-                    MetricLabels.MODEL_NAME_DIMENSION: self.endpoint,
-                }
-            )
+        logger.debug("Invoking Model: %s", self.endpoint)
+        metrics.set_dimensions()
+        metrics.put_dimensions(self._metric_dimensions)
 
         try:
             self.request_count += 1
-            if isinstance(metrics, MetricsLogger):
-                metrics.put_metric(MetricLabels.INVOCATIONS, 1, str(Unit.COUNT.value))
+            metrics.put_metric(MetricLabels.INVOCATIONS, 1, str(Unit.COUNT.value))
 
             with Timer(
                 task_str="Invoke SM Endpoint",
@@ -102,27 +144,23 @@ class SMDetector(Detector):
                 # Invoke the real SageMaker model endpoint
                 model_response = self.sm_client.invoke_endpoint(EndpointName=self.endpoint, Body=payload)
                 retry_count = model_response.get("ResponseMetadata", {}).get("RetryAttempts", 0)
-                if isinstance(metrics, MetricsLogger):
-                    metrics.put_metric(MetricLabels.RETRIES, retry_count, str(Unit.COUNT.value))
+                metrics.put_metric(MetricLabels.RETRIES, retry_count, str(Unit.COUNT.value))
 
                 # Parse the model's response as a geojson FeatureCollection
-                return geojson.loads(model_response.get("Body").read())
+                return normalize_feature_properties(json_loads(model_response.get("Body").read()))
 
+        # Errors are re-raised to the tile worker which logs them with their traceback so only a summary is logged here
         except ClientError as ce:
             error_code = ce.response.get("Error", {}).get("Code")
             http_status_code = ce.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
-            if isinstance(metrics, MetricsLogger):
-                metrics.put_metric(MetricLabels.ERRORS, 1, str(Unit.COUNT.value))
+            metrics.put_metric(MetricLabels.ERRORS, 1, str(Unit.COUNT.value))
             logger.error(
-                f"Unable to get detections from model - HTTP Status Code: {http_status_code}, Error Code: {error_code}"
+                "Unable to get detections from model - HTTP Status Code: %s, Error Code: %s", http_status_code, error_code
             )
-            logger.exception(ce)
             raise ce
         except JSONDecodeError as de:
-            if isinstance(metrics, MetricsLogger):
-                metrics.put_metric(MetricLabels.ERRORS, 1, str(Unit.COUNT.value))
+            metrics.put_metric(MetricLabels.ERRORS, 1, str(Unit.COUNT.value))
             logger.error("Unable to decode response from model.")
-            logger.exception(de)
             raise de
 
 
@@ -1,11 +1,14 @@
 #  Copyright 2023-2024 Amazon.com, Inc. or its affiliates.
 
 import logging
+from typing import Optional, Tuple
 
+from cachetools import LRUCache
 from osgeo import gdal
 
 from aws.osml.gdal import load_gdal_dataset, set_gdal_default_configuration
 from aws.osml.model_runner.api import get_image_path
+from aws.osml.photogrammetry import SensorModel
 
 from .api import ImageRequest, InvalidImageRequestException, RegionRequest
 from .app_config import ServiceConfig
@@ -22,6 +25,9 @@ from .tile_worker import TilingStrategy, VariableOverlapTilingStrategy
 logger = logging.getLogger(__name__)
 gdal.UseExceptions()
 
+# Number of opened images (GDAL dataset and sensor model) kept for reuse by later regions of the same image
+DATASET_CACHE_SIZE = 5
+
 
 class ModelRunner:
     """
@@ -41,12 +47,18 @@ class ModelRunner:
         self.config = ServiceConfig()
         self.tiling_strategy = tiling_strategy
 
-        # Set up queues and monitors
+        # Set up queues and monitors. Pending regions take priority so the wait for new work is spent long polling
+        # the region queue; the image queue is only short polled once the region queue comes back empty so an idle
+        # runner never holds a newly queued region up behind a wait on the image queue.
         self.image_request_queue = RequestQueue(self.config.image_queue, wait_seconds=0)
         self.image_requests_iter = iter(self.image_request_queue)
         self.region_request_queue = RequestQueue(self.config.region_queue, wait_seconds=10)
         self.region_requests_iter = iter(self.region_request_queue)
 
+        # Regions of an image are usually processed back to back so recently opened images are kept to avoid
+        # reparsing their headers and rebuilding their sensor models for every region
+        self.dataset_cache: LRUCache = LRUCache(maxsize=DATASET_CACHE_SIZE)
+
         # Set up tables and status monitors
         self.job_table = JobTable(self.config.job_table)
         self.region_request_table = RegionRequestTable(self.config.region_request_table)
@@ -135,7 +147,8 @@ class ModelRunner:
             try:
                 region_request = RegionRequest(region_request_attributes)
                 image_path = get_image_path(region_request.image_url, region_request.image_read_role)
-                raster_dataset, sensor_model = load_gdal_dataset(image_path)
+                dataset_key = (image_path, region_request.image_read_role)
+                raster_dataset, sensor_model = self._load_gdal_dataset(dataset_key)
                 region_request_item = self._get_or_create_region_request_item(region_request)
                 image_request_item = self.region_request_handler.process_region_request(
                     region_request, region_request_item, raster_dataset, sensor_model
@@ -144,6 +157,8 @@ class ModelRunner:
                     self.image_request_handler.complete_image_request(
                         region_request, str(raster_dataset.GetDriver().ShortName).upper(), raster_dataset, sensor_model
                     )
+                    # No more regions of this image are expected so release the dataset
+                    self.dataset_cache.pop(dataset_key, None)
                 self.region_request_queue.finish_request(receipt_handle)
             except RetryableJobException as err:
                 logger.warning(f"Retrying region request due to: {err}")
@@ -161,6 +176,23 @@ class ModelRunner:
         else:
             return False
 
+    def _load_gdal_dataset(self, dataset_key: Tuple[str, Optional[str]]) -> Tuple[gdal.Dataset, Optional[SensorModel]]:
+        """
+        Loads the GDAL dataset and sensor model of an image, reusing the ones opened for an earlier region of the
+        same image when they are still cached. Datasets are cached per image path and read role so a job never
+        reuses a dataset that was opened with another job's credentials.
+
+        :param dataset_key: Tuple[str, Optional[str]] = the GDAL path of the image and the role used to read it
+
+        :return: Tuple[gdal.Dataset, Optional[SensorModel]] = the raster dataset and its sensor model
+        """
+        cached_dataset = self.dataset_cache.get(dataset_key)
+        if cached_dataset is None:
+            image_path, _ = dataset_key
+            cached_dataset = load_gdal_dataset(image_path)
+            self.dataset_cache[dataset_key] = cached_dataset
+        return cached_dataset
+
     def _process_image_requests(self) -> bool:
         """
         Processes messages from the image request queue.
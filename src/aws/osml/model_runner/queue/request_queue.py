@@ -33,12 +33,12 @@ class RequestQueue:
                     WaitTimeSeconds=self.wait_seconds,
                 )
 
-                logging.debug(f"Dequeued processing request {queue_response}")
+                logging.debug("Dequeued processing request %s", queue_response)
 
                 if "Messages" in queue_response:
                     for message in queue_response["Messages"]:
                         message_body = message["Body"]
-                        logging.debug(f"Message Body {message_body}")
+                        logging.debug("Message Body %s", message_body)
 
                         try:
                             work_request = json.loads(message_body)
@@ -46,7 +46,7 @@ class RequestQueue:
                             yield message["ReceiptHandle"], work_request
 
                         except json.JSONDecodeError:
-                            logging.warning(f"Skipping message that is not valid JSON: {message_body}")
+                            logging.warning("Skipping message that is not valid JSON: %s", message_body)
                             yield None, None
                 else:
                     yield None, None
@@ -1,16 +1,14 @@
 #  Copyright 2023-2024 Amazon.com, Inc. or its affiliates.
 
 import logging
-import sys
 from typing import List, Optional
 
 import boto3
-import geojson
 from geojson import Feature, FeatureCollection
 
 from aws.osml.model_runner.api import SinkMode, SinkType
 from aws.osml.model_runner.app_config import BotoConfig, ServiceConfig
-from aws.osml.model_runner.common import get_credentials_for_assumed_role
+from aws.osml.model_runner.common import feature_collection_to_bytes, get_credentials_for_assumed_role
 
 from .exceptions import InvalidKinesisStreamException
 from .sink import Sink
@@ -75,13 +73,13 @@ class KinesisSink(Sink):
         if self.validate_kinesis_stream():
             for feature in features:
                 # Serialize feature data to JSON
-                record_data = geojson.dumps(FeatureCollection([feature]))
+                record_data = feature_collection_to_bytes(FeatureCollection([feature]))
 
                 # Create the record dict
                 record = {"Data": record_data, "PartitionKey": job_id}
 
                 # Calculate size of the entire record (Data + PartitionKey)
-                record_size = sys.getsizeof(geojson.dumps(record))
+                record_size = len(record_data) + len(job_id.encode("utf-8"))
 
                 # If adding the next record would exceed the 5 MB batch limit, flush the current batch
                 if pending_features_size + record_size > int(ServiceConfig.kinesis_max_record_size_batch) or len(
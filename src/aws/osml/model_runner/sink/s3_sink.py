@@ -6,14 +6,17 @@ import tempfile
 from typing import List, Optional
 
 import boto3
-import geojson
 from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 from geojson import Feature, FeatureCollection
 
-from aws.osml.model_runner.api import SinkMode, SinkType
+from aws.osml.model_runner.api import SinkFormat, SinkMode, SinkType
 from aws.osml.model_runner.app_config import BotoConfig
-from aws.osml.model_runner.common import get_credentials_for_assumed_role
+from aws.osml.model_runner.common import (
+    feature_collection_to_bytes,
+    get_credentials_for_assumed_role,
+    iter_features_as_ndjson,
+)
 
 from .sink import Sink
 
@@ -31,6 +34,7 @@ class S3Sink(Sink):
     :param bucket: The name of the S3 bucket.
     :param prefix: The prefix within the bucket where the files will be stored.
     :param assumed_role: Optional IAM role ARN to assume for accessing the bucket.
+    :param output_format: The encoding of the aggregated features, a GeoJSON FeatureCollection by default.
     """
 
     def __init__(
@@ -38,9 +42,11 @@ class S3Sink(Sink):
         bucket: str,
         prefix: str,
         assumed_role: Optional[str] = None,
+        output_format: SinkFormat = SinkFormat.GEOJSON,
     ) -> None:
         self.bucket = bucket
         self.prefix = prefix
+        self.output_format = output_format
         if assumed_role:
             assumed_credentials = get_credentials_for_assumed_role(assumed_role)
             # Here we will be writing to S3 using an IAM role other than the one for this process.
@@ -78,19 +84,22 @@ class S3Sink(Sink):
 
         :raises ClientError: If there are errors while uploading the file to S3.
         """
-        features_collection = FeatureCollection(features)
-
         # validate if S3 bucket exists and accessible
         if self.validate_s3_bucket():
             # image_id is the concatenation of the job id and source image url in s3. We just
             # want to base our key off of the original image file name so split by '/' and use
             # the last element
-            object_key = os.path.join(self.prefix, image_id.split("/")[-1] + ".geojson")
+            extension = ".ndjson" if self.output_format == SinkFormat.NDJSON else ".geojson"
+            object_key = os.path.join(self.prefix, image_id.split("/")[-1] + extension)
 
             # Create a temporary file to store aggregated features as a GeoJSON data
             with tempfile.NamedTemporaryFile(delete=True) as temp_file:
-                with open(temp_file.name, "w") as f:
-                    f.write(geojson.dumps(features_collection))
+                with open(temp_file.name, "wb") as f:
+                    if self.output_format == SinkFormat.NDJSON:
+                        # Stream the features into the file one line at a time
+                        f.writelines(iter_features_as_ndjson(features))
+                    else:
+                        f.write(feature_collection_to_bytes(FeatureCollection(features)))
 
                 # Use upload_file to upload the file to S3
                 self.s3_client.upload_file(
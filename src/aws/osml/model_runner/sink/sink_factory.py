@@ -6,7 +6,7 @@ from typing import Any, Dict, List
 
 from geojson import Feature
 
-from aws.osml.model_runner.api import InvalidImageRequestException, SinkMode
+from aws.osml.model_runner.api import InvalidImageRequestException, SinkFormat, SinkMode
 from aws.osml.model_runner.sink import KinesisSink, S3Sink, Sink
 
 logger = logging.getLogger(__name__)
@@ -37,6 +37,7 @@ class SinkFactory:
                         destination["bucket"],
                         destination["prefix"],
                         destination.get("role"),
+                        SinkFormat(destination.get("format", SinkFormat.GEOJSON)),
                     )
                 )
             elif sink_type == KinesisSink.name():
@@ -121,6 +121,7 @@ class VariableOverlapTilingStrategy(TilingStrategy):
         )
         total_skipped = 0
         deduped_features = []
+        overlapping_groups = []
         features_grouped_by_region = self._group_features_by_overlap(features, adjusted_region_size, adjusted_overlap)
         for region_key, region_features in features_grouped_by_region.items():
             logger.debug(
@@ -138,7 +139,7 @@ class VariableOverlapTilingStrategy(TilingStrategy):
 
             if region_key[0] != region_key[1] or region_key[2] != region_key[3]:
                 # The Group contains contributions from multiple regions, run selection on the entire group
-                deduped_features.extend(feature_selector.select_features(region_features))
+                overlapping_groups.append(region_features)
             else:
                 # Not an overlap between regions group these features using tile size to identify overlaps
                 features_grouped_by_tile = self._group_features_by_overlap(
@@ -148,12 +149,16 @@ class VariableOverlapTilingStrategy(TilingStrategy):
                 for tile_key, tile_features in features_grouped_by_tile.items():
                     if tile_key[0] != tile_key[1] or tile_key[2] != tile_key[3]:
                         # Group contains contributions from multiple tiles, run selection
-                        deduped_features.extend(feature_selector.select_features(tile_features))
+                        overlapping_groups.append(tile_features)
                     else:
                         # No overlap between tiles, features can be added directly to the result
                         total_skipped += len(tile_features)
                         deduped_features.extend(tile_features)
 
+        # The groups are independent of each other so selection can run on all of them as a single batch
+        for selected_features in feature_selector.select_features_batch(overlapping_groups):
+            deduped_features.extend(selected_features)
+
         logger.debug(
             "VariableOverlapTilingStrategy.cleanup_duplicate_features: "
             f"Skipped processing of {total_skipped} of {len(features)} features. "
@@ -89,6 +89,27 @@ class TestImageRequest(TestCase):
         assert isinstance(distillation_option, list)
         assert len(distillation_option) == 1
 
+    def test_post_processing_parsing(self):
+        """
+        Test that the camelCase post-processing keys of an external message are mapped to the dataclass fields.
+        """
+        from aws.osml.model_runner.common import FeatureDistillationAlgorithmType, FeatureDistillationSoftNMS
+
+        post_processing = ImageRequest._parse_post_processing(
+            [
+                {
+                    "step": "FEATURE_DISTILLATION",
+                    "algorithm": {"algorithmType": "SOFT_NMS", "iouThreshold": 0.6, "skipBoxThreshold": 0.001},
+                }
+            ]
+        )
+        assert len(post_processing) == 1
+        algorithm = post_processing[0].algorithm
+        assert isinstance(algorithm, FeatureDistillationSoftNMS)
+        assert algorithm.algorithm_type == FeatureDistillationAlgorithmType.SOFT_NMS
+        assert algorithm.iou_threshold == 0.6
+        assert algorithm.skip_box_threshold == 0.001
+
     def test_image_request_from_minimal_message_legacy_output(self):
         """
         Test ImageRequest creation from a minimal message using legacy output fields.
@@ -135,6 +156,41 @@ class TestImageRequest(TestCase):
         # Should fail with an invalid sync type provided
         assert not request.is_valid()
 
+    def test_image_request_invalid_sink_format(self):
+        """
+        Test ImageRequest validation rejects sink formats that are not a SinkFormat, including lowercase values.
+        """
+        for sink_format in ["GEOJSONL", "ndjson"]:
+            request = ImageRequest.from_external_message(
+                {
+                    "jobName": "test-job-name",
+                    "jobId": "test-job-id",
+                    "imageUrls": ["test-image-url"],
+                    "outputs": [{"type": "S3", "bucket": "test-bucket", "prefix": "images/outputs", "format": sink_format}],
+                    "imageProcessor": {"name": "test-model", "type": "SM_ENDPOINT"},
+                    "imageProcessorTileSize": 1024,
+                    "imageProcessorTileOverlap": 50,
+                }
+            )
+            assert not request.is_valid()
+
+    def test_image_request_valid_sink_format(self):
+        """
+        Test ImageRequest validation accepts the NDJSON sink format.
+        """
+        request = ImageRequest.from_external_message(
+            {
+                "jobName": "test-job-name",
+                "jobId": "test-job-id",
+                "imageUrls": ["test-image-url"],
+                "outputs": [{"type": "S3", "bucket": "test-bucket", "prefix": "images/outputs", "format": "NDJSON"}],
+                "imageProcessor": {"name": "test-model", "type": "SM_ENDPOINT"},
+                "imageProcessorTileSize": 1024,
+                "imageProcessorTileOverlap": 50,
+            }
+        )
+        assert request.is_valid()
+
     def test_image_request_invalid_image_path(self):
         """
         Test validation of an invalid S3 image path.
@@ -107,6 +107,34 @@ class TestRequestUtils(unittest.TestCase):
         self.sample_request_data.model_invocation_role = "012345678910:role/OversightMLModelInvoker"
         assert not shared_properties_are_valid(self.sample_request_data)
 
+    def test_get_image_path(self):
+        from unittest.mock import patch
+
+        from aws.osml.model_runner.api.request_utils import get_image_path
+
+        with patch("aws.osml.model_runner.api.request_utils.validate_image_path") as mock_validate:
+            assert get_image_path("s3://test-bucket/images/small.ntf", None) == "/vsis3/test-bucket/images/small.ntf"
+            mock_validate.assert_called_once_with("s3://test-bucket/images/small.ntf", None)
+            assert get_image_path("./test/data/small.ntf", None) == "./test/data/small.ntf"
+            mock_validate.assert_called_once()
+
+    def test_validate_image_path_cached(self):
+        from unittest.mock import patch
+
+        from aws.osml.model_runner.api.request_utils import VALIDATED_IMAGE_CACHE_TTL, validate_image_path
+
+        validate_image_path.cache_clear()
+        with patch("aws.osml.model_runner.api.request_utils.boto3.client") as mock_client:
+            assert validate_image_path("s3://test-bucket/images/small.ntf")
+            assert validate_image_path("s3://test-bucket/images/small.ntf")
+            mock_client.return_value.head_object.assert_called_once_with(Bucket="test-bucket", Key="images/small.ntf")
+
+            # Once the cached validation expires the image is checked again
+            validate_image_path.cache.expire(validate_image_path.cache.timer() + VALIDATED_IMAGE_CACHE_TTL + 1)
+            assert validate_image_path("s3://test-bucket/images/small.ntf")
+            assert mock_client.return_value.head_object.call_count == 2
+        validate_image_path.cache_clear()
+
     @staticmethod
     def build_request_data():
         from aws.osml.model_runner.api.region_request import RegionRequest
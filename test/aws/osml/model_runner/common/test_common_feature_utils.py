@@ -0,0 +1,51 @@
+#  Copyright 2023-2024 Amazon.com, Inc. or its affiliates.
+
+import importlib.util
+import json
+import unittest
+from unittest import TestCase
+
+import geojson
+import numpy as np
+
+ORJSON_INSTALLED = importlib.util.find_spec("orjson") is not None
+
+
+class TestFeatureUtils(TestCase):
+    def test_feature_collection_to_bytes(self):
+        from aws.osml.model_runner.common import feature_collection_to_bytes
+
+        feature_collection = geojson.FeatureCollection(
+            [geojson.Feature(geometry=geojson.Point((1.0, 2.0)), properties={"bounds_imcoords": [0.0, 0.0, 10.0, 10.0]})]
+        )
+        encoded = feature_collection_to_bytes(feature_collection)
+        assert isinstance(encoded, bytes)
+        assert json.loads(encoded) == json.loads(geojson.dumps(feature_collection))
+
+    def test_iter_features_as_ndjson(self):
+        from aws.osml.model_runner.common import iter_features_as_ndjson
+
+        features = [geojson.Feature(geometry=geojson.Point((float(i), 2.0)), properties={"index": i}) for i in range(3)]
+        lines = list(iter_features_as_ndjson(features))
+        assert len(lines) == 3
+        assert all(line.endswith(b"\n") and line.count(b"\n") == 1 for line in lines)
+        assert [json.loads(line)["properties"]["index"] for line in lines] == [0, 1, 2]
+
+    @unittest.skipUnless(ORJSON_INSTALLED, "orjson is not installed")
+    def test_feature_collection_to_bytes_numpy(self):
+        from aws.osml.model_runner.common import feature_collection_to_bytes
+
+        feature_collection = geojson.FeatureCollection(
+            [
+                geojson.Feature(
+                    geometry=geojson.Point((1.0, 2.0)),
+                    properties={"bounds_imcoords": np.array([0.0, 0.0, 10.0, 10.0]), "score": np.float32(0.5)},
+                )
+            ]
+        )
+        decoded = json.loads(feature_collection_to_bytes(feature_collection))
+        assert decoded["features"][0]["properties"] == {"bounds_imcoords": [0.0, 0.0, 10.0, 10.0], "score": 0.5}
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+#  Copyright 2023-2024 Amazon.com, Inc. or its affiliates.
+
+from unittest import TestCase, main
+
+
+class TestMetricsUtils(TestCase):
+    def test_null_metrics_logger_discards_calls(self):
+        from aws.osml.model_runner.common import NullMetricsLogger
+
+        metrics = NullMetricsLogger()
+        assert metrics.set_dimensions() is None
+        assert metrics.put_dimensions({"Operation": "Testing"}) is None
+        assert metrics.put_metric("Invocations", 1, "Count") is None
+
+    def test_metric_scope_injects_metrics_logger(self):
+        from aws_embedded_metrics.logger.metrics_logger import MetricsLogger
+
+        from aws.osml.model_runner.common import metric_scope
+
+        @metric_scope
+        def sample_task(value, metrics=None):
+            metrics.put_metric("Invocations", 1, "Count")
+            return value, metrics
+
+        value, metrics = sample_task("A")
+        assert value == "A"
+        assert isinstance(metrics, MetricsLogger)
+
+    def test_metric_scope_substitutes_null_metrics_logger(self):
+        from aws.osml.model_runner.common import NULL_METRICS_LOGGER, metric_scope
+
+        @metric_scope
+        def sample_task(metrics=None):
+            metrics.put_metric("Invocations", 1, "Count")
+            return metrics
+
+        # The innermost wrapper is the one that substitutes the null logger when metric_scope is bypassed
+        assert sample_task.__wrapped__() is NULL_METRICS_LOGGER
+
+    def test_metric_scope_replaces_null_metrics(self):
+        from aws_embedded_metrics.logger.metrics_logger import MetricsLogger
+
+        from aws.osml.model_runner.common import metric_scope
+
+        @metric_scope
+        def sample_task(metrics=None):
+            return metrics
+
+        # Calls through the decorator always get a real logger, even when the caller passes None
+        assert isinstance(sample_task(metrics=None), MetricsLogger)
+
+
+if __name__ == "__main__":
+    main()
@@ -62,6 +62,24 @@ class TestRegionRequestTable(unittest.TestCase):
         assert resulting_region_request_item.job_id == TEST_JOB_ID
         assert resulting_region_request_item.region_status == RequestStatus.STARTED
 
+    def test_start_region_requests_success(self):
+        """
+        Validate that starting several region requests at once stores all of them in the table.
+        """
+        from aws.osml.model_runner.common import RequestStatus
+        from aws.osml.model_runner.database.region_request_table import RegionRequestItem
+
+        region_request_items = [
+            RegionRequestItem(f"{TEST_REGION_ID}-{index}", TEST_IMAGE_ID, TEST_JOB_ID) for index in range(30)
+        ]
+        self.region_request_table.start_region_requests(region_request_items)
+        for index in range(30):
+            resulting_region_request_item = self.region_request_table.get_region_request(
+                f"{TEST_REGION_ID}-{index}", TEST_IMAGE_ID
+            )
+            assert resulting_region_request_item.job_id == TEST_JOB_ID
+            assert resulting_region_request_item.region_status == RequestStatus.STARTED
+
     def test_region_complete_success(self):
         """
         Validate that completing a region request updates the DDB item successfully.
@@ -1,8 +1,10 @@
 #  Copyright 2023-2024 Amazon.com, Inc. or its affiliates.
+import math
 import unittest
 from unittest import TestCase
 
 import geojson
+import pytest
 from geojson import Feature, Point
 
 
@@ -209,6 +211,153 @@ class TestFeatureSelection(TestCase):
         processed_features = feature_selector.select_features(original_features)
         assert len(processed_features) == 3
 
+    def test_feature_selection_nms_keeps_highest_score(self):
+        """
+        Test that NMS keeps the highest scoring feature from a group of overlapping features.
+        """
+        from aws.osml.model_runner.common import FeatureDistillationNMS
+        from aws.osml.model_runner.inference import FeatureSelector
+
+        feature_selector = FeatureSelector(options=FeatureDistillationNMS())
+
+        original_features = [
+            Feature(
+                id="feature_a",
+                geometry=Point((0, 0)),
+                properties={
+                    "bounds_imcoords": [50, 50, 100, 100],
+                    "featureClasses": [{"iri": "boat", "score": 0.45}],
+                },
+            ),
+            Feature(
+                id="feature_b",
+                geometry=Point((0, 0)),
+                properties={
+                    "bounds_imcoords": [45, 45, 101, 101],
+                    "featureClasses": [{"iri": "boat", "score": 0.57}],
+                },
+            ),
+        ]
+        processed_features = feature_selector.select_features(original_features)
+        assert [feature["id"] for feature in processed_features] == ["feature_b"]
+
+    def test_feature_selection_nms_identity_threshold(self):
+        """
+        Test that NMS returns the input features unchanged when the IoU threshold can never be exceeded.
+        """
+        from aws.osml.model_runner.common import FeatureDistillationNMS
+        from aws.osml.model_runner.inference import FeatureSelector
+
+        feature_selector = FeatureSelector(options=FeatureDistillationNMS(iou_threshold=1.0))
+
+        original_features = [
+            Feature(
+                id="feature_a",
+                geometry=Point((0, 0)),
+                properties={"bounds_imcoords": [50, 50, 100, 100]},
+            ),
+            Feature(
+                id="feature_b",
+                geometry=Point((0, 0)),
+                properties={"bounds_imcoords": [50, 50, 100, 100]},
+            ),
+        ]
+        assert feature_selector.select_features(original_features) == original_features
+
+    def test_feature_selection_batch(self):
+        """
+        Test that batch selection runs the selection algorithm independently on each group of features.
+        """
+        from aws.osml.model_runner.common import FeatureDistillationNMS
+        from aws.osml.model_runner.inference import FeatureSelector
+
+        feature_selector = FeatureSelector(options=FeatureDistillationNMS())
+
+        overlapping_features = [
+            Feature(id="feature_a", geometry=Point((0, 0)), properties={"bounds_imcoords": [50, 50, 100, 100]}),
+            Feature(id="feature_b", geometry=Point((0, 0)), properties={"bounds_imcoords": [45, 45, 101, 101]}),
+        ]
+        separate_features = [
+            Feature(id="feature_c", geometry=Point((0, 0)), properties={"bounds_imcoords": [50, 50, 100, 100]}),
+            Feature(id="feature_d", geometry=Point((0, 0)), properties={"bounds_imcoords": [250, 250, 300, 275]}),
+        ]
+        selected_features = feature_selector.select_features_batch([overlapping_features, separate_features, []])
+        assert [len(features) for features in selected_features] == [1, 2, 0]
+
+    def test_feature_selection_batch_broken_pool(self):
+        """
+        Test that batch selection falls back to running in-process and replaces the shared pool when a worker
+        process dies.
+        """
+        from concurrent.futures.process import BrokenProcessPool
+        from unittest.mock import MagicMock, patch
+
+        from aws.osml.model_runner.common import FeatureDistillationNMS
+        from aws.osml.model_runner.inference import FeatureSelector, feature_selection
+
+        feature_selector = FeatureSelector(options=FeatureDistillationNMS())
+        feature_lists = [
+            [
+                Feature(id="feature_a", geometry=Point((0, 0)), properties={"bounds_imcoords": [50, 50, 100, 100]}),
+                Feature(id="feature_b", geometry=Point((0, 0)), properties={"bounds_imcoords": [45, 45, 101, 101]}),
+            ],
+            [
+                Feature(id="feature_c", geometry=Point((0, 0)), properties={"bounds_imcoords": [50, 50, 100, 100]}),
+                Feature(id="feature_d", geometry=Point((0, 0)), properties={"bounds_imcoords": [250, 250, 300, 275]}),
+            ],
+        ]
+        broken_pool = MagicMock()
+        broken_pool.map.side_effect = BrokenProcessPool("A child process terminated abruptly")
+        with patch.object(feature_selection, "PARALLEL_SELECTION_MIN_FEATURES", 0), patch.object(
+            feature_selection, "_selection_pool", broken_pool
+        ), patch.object(feature_selection, "_selection_pool_workers", 2):
+            selected_features = feature_selector.select_features_batch(feature_lists, n_workers=2)
+            assert feature_selection._selection_pool is None
+        assert [len(features) for features in selected_features] == [1, 2]
+        broken_pool.shutdown.assert_called_once_with(wait=False)
+
+    def test_feature_selection_batch_soft_nms_pool(self):
+        """
+        Test that batch selection run in the worker pool rescores the caller's features the same way as running the
+        batch in-process.
+        """
+        import copy
+        from unittest.mock import patch
+
+        from aws.osml.model_runner.common import FeatureDistillationSoftNMS
+        from aws.osml.model_runner.inference import FeatureSelector, feature_selection
+
+        feature_selector = FeatureSelector(options=FeatureDistillationSoftNMS())
+        feature_lists = [
+            [
+                Feature(
+                    id=f"{group}_{index}",
+                    geometry=Point((0, 0)),
+                    properties={
+                        "bounds_imcoords": [45 + index * 5, 45 + index * 5, 101 + index * 5, 101 + index * 5],
+                        "featureClasses": [{"iri": "boat", "score": 0.9 - index / 10}],
+                    },
+                )
+                for index in range(3)
+            ]
+            for group in ("a", "b")
+        ]
+        in_process_lists = copy.deepcopy(feature_lists)
+        expected_features = feature_selector.select_features_batch(in_process_lists, n_workers=1)
+
+        with patch.object(feature_selection, "PARALLEL_SELECTION_MIN_FEATURES", 0):
+            selected_features = feature_selector.select_features_batch(feature_lists, n_workers=2)
+        pool = feature_selection._selection_pool
+        assert pool is not None
+        feature_selection._reset_selection_pool(pool)
+
+        assert selected_features == expected_features
+        assert feature_lists == in_process_lists
+        for features, original_features in zip(selected_features, feature_lists):
+            # The selected features are the caller's own features, rescored in place
+            assert all(any(feature is original for original in original_features) for feature in features)
+            assert all("rawScore" in feature["properties"]["featureClasses"][0] for feature in features)
+
     def test_feature_selection_nms_point_feature(self):
         """
         Test that NMS handles point features correctly.
@@ -232,6 +381,56 @@ class TestFeatureSelection(TestCase):
         processed_features = feature_selector.select_features(test_feature)
         assert len(processed_features) == 1
 
+    def test_feature_selection_nms_point_features_high_label_id(self):
+        """
+        Test that NMS still suppresses duplicate point features when a large image span and a high label id shift
+        their boxes far from the origin.
+        """
+        from aws.osml.model_runner.common import FeatureDistillationNMS
+        from aws.osml.model_runner.inference import FeatureSelector
+
+        feature_selector = FeatureSelector(options=FeatureDistillationNMS())
+
+        # Each distinct category is assigned the next label id so the duplicate points end up with label 150
+        original_features = [
+            Feature(
+                id=f"filler_{index}",
+                geometry=Point((0, 0)),
+                properties={
+                    "bounds_imcoords": [index * 333, index * 333, index * 333 + 10, index * 333 + 10],
+                    "featureClasses": [{"iri": f"category_{index}", "score": 0.5}],
+                },
+            )
+            for index in range(150)
+        ]
+        original_features.append(
+            Feature(
+                id="filler_span",
+                geometry=Point((0, 0)),
+                properties={
+                    "bounds_imcoords": [49990, 49990, 50000, 50000],
+                    "featureClasses": [{"iri": "category_0", "score": 0.5}],
+                },
+            )
+        )
+        for feature_id, score in (("point_a", 0.9), ("point_b", 0.8)):
+            original_features.append(
+                Feature(
+                    id=feature_id,
+                    geometry=Point((0, 0)),
+                    properties={
+                        "bounds_imcoords": [25000.5, 25000.5, 25000.5, 25000.5],
+                        "featureClasses": [{"iri": "boat", "score": score}],
+                    },
+                )
+            )
+
+        processed_features = feature_selector.select_features(original_features)
+        processed_ids = [feature["id"] for feature in processed_features]
+        assert "point_a" in processed_ids
+        assert "point_b" not in processed_ids
+        assert len(processed_features) == 152
+
     def test_feature_selection_soft_nms_overlaps(self):
         """
         Test that Soft NMS deduplicates overlapping features and adjusts scores.
@@ -285,7 +484,8 @@ class TestFeatureSelection(TestCase):
                 "featureClasses": [
                     {
                         "iri": "boat",
-                        "score": 0.85,
+                        # feature_a overlaps feature_b with an IoU of 2500/3136 so its score decays accordingly
+                        "score": pytest.approx(0.85 * math.exp(-((2500 / 3136) ** 2) / 0.1)),
                         "rawScore": 0.85,
                     }
                 ],
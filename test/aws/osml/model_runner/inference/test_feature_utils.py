@@ -133,21 +133,74 @@ class TestFeatureUtils(unittest.TestCase):
         for i in range(len(sample_image_bounds)):
             assert pytest.approx(sample_image_bounds[i], rel=0.49, abs=0.49) == shape.exterior.coords[i]
 
-    def test_convert_nested_coordinate_lists_single_vs_nested(self):
+    def test_convert_nested_coordinate_lists_batch(self):
         """
-        Test the conversion of single versus nested coordinates using a mock conversion function.
+        Test that the batch conversion receives every coordinate at once and preserves the nesting structure.
         """
-        from aws.osml.model_runner.inference.feature_utils import convert_nested_coordinate_lists
+        from aws.osml.model_runner.inference.feature_utils import convert_nested_coordinate_lists_batch
 
-        single_coord = [-77.0364, 38.8976]
-        nested_coords = [[-77.0364, 38.8976], [-77.0365, 38.8977]]
+        nested_coords = [[[-77.0364, 38.8976], [-77.0365, 38.8977, 10.0]], [[-77.0366, 38.8978]]]
+        batches = []
 
-        converted_single = convert_nested_coordinate_lists(single_coord, lambda x: x)
-        converted_nested = convert_nested_coordinate_lists(nested_coords, lambda x: x)
+        def mock_batch_conversion(world_coordinates):
+            batches.append(world_coordinates)
+            return world_coordinates[:, :2]
 
-        assert isinstance(converted_single, tuple)
-        assert isinstance(converted_nested, list)
-        assert len(converted_nested) == 2
+        converted = convert_nested_coordinate_lists_batch(nested_coords, mock_batch_conversion)
+
+        assert len(batches) == 1
+        assert batches[0].shape == (3, 3)
+        assert batches[0][1, 2] == 10.0
+        assert len(converted) == 2
+        assert len(converted[0]) == 2
+        assert pytest.approx(converted[1][0]) == (np.radians(-77.0366), np.radians(38.8978))
+
+    def test_world_to_image_batch(self):
+        """
+        Test that a sensor model's batch conversion is used when available and that models without one are
+        converted coordinate by coordinate.
+        """
+        from unittest.mock import Mock
+
+        from aws.osml.model_runner.inference.feature_utils import world_to_image_batch
+        from aws.osml.photogrammetry import ImageCoordinate, SensorModel
+
+        world_coordinates = np.array([[-1.3, 0.6, 0.0], [-1.4, 0.7, 5.0]])
+
+        batch_sensor_model = Mock()
+        batch_sensor_model.world_to_image_batch.return_value = world_coordinates[:, :2]
+        assert np.array_equal(world_to_image_batch(batch_sensor_model, world_coordinates), world_coordinates[:, :2])
+        batch_sensor_model.world_to_image.assert_not_called()
+
+        sensor_model = Mock(spec=SensorModel)
+        sensor_model.world_to_image.side_effect = lambda world_coordinate: ImageCoordinate(world_coordinate.coordinate[:2])
+        assert np.array_equal(world_to_image_batch(sensor_model, world_coordinates), world_coordinates[:, :2])
+        assert sensor_model.world_to_image.call_count == 2
+
+    def test_image_to_world_batch(self):
+        """
+        Test that a sensor model's batch conversion is used when available and that models without one are
+        converted coordinate by coordinate.
+        """
+        from unittest.mock import Mock
+
+        from aws.osml.model_runner.inference.feature_utils import image_to_world_batch
+        from aws.osml.photogrammetry import GeodeticWorldCoordinate, SensorModel
+
+        image_coordinates = np.array([[10.0, 20.0], [30.0, 40.0]])
+        expected = np.column_stack([image_coordinates, np.zeros(2)])
+
+        batch_sensor_model = Mock()
+        batch_sensor_model.image_to_world_batch.return_value = expected
+        assert np.array_equal(image_to_world_batch(batch_sensor_model, image_coordinates), expected)
+        batch_sensor_model.image_to_world.assert_not_called()
+
+        sensor_model = Mock(spec=SensorModel)
+        sensor_model.image_to_world.side_effect = lambda image_coordinate: GeodeticWorldCoordinate(
+            [image_coordinate.x, image_coordinate.y, 0.0]
+        )
+        assert np.array_equal(image_to_world_batch(sensor_model, image_coordinates), expected)
+        assert sensor_model.image_to_world.call_count == 2
 
     def test_calculate_processing_bounds_no_roi(self):
         """
@@ -207,6 +260,22 @@ class TestFeatureUtils(unittest.TestCase):
         processing_bounds = calculate_processing_bounds(ds, roi, sensor_model)
         assert processing_bounds == ((0, 0), (50, 50))
 
+    def test_calculate_processing_bounds_outside_image(self):
+        """
+        Test calculating processing bounds with an ROI that does not overlap the image; there is nothing to process.
+        """
+        from aws.osml.model_runner.inference.feature_utils import calculate_processing_bounds
+        from aws.osml.photogrammetry import ImageCoordinate
+
+        ds, sensor_model = self.get_dataset_and_camera()
+        chip_ul = sensor_model.image_to_world(ImageCoordinate([200, 200]))
+        chip_lr = sensor_model.image_to_world(ImageCoordinate([250, 250]))
+        min_vals = np.minimum(chip_ul.coordinate, chip_lr.coordinate)
+        max_vals = np.maximum(chip_ul.coordinate, chip_lr.coordinate)
+        roi = shapely.geometry.box(degrees(min_vals[0]), degrees(min_vals[1]), degrees(max_vals[0]), degrees(max_vals[1]))
+
+        assert calculate_processing_bounds(ds, roi, sensor_model) is None
+
     def test_calculate_processing_bounds_chip(self):
         """
         Test calculating processing bounds for a specific chip within the image.
@@ -250,6 +319,83 @@ class TestFeatureUtils(unittest.TestCase):
         source_property = get_source_property("./test/data/GeogToWGS84GeoKey5.tif", "NITF", dataset=None)
         assert source_property is None
 
+    def test_get_source_property_nitf(self):
+        """
+        Test that the source property is built from the NITF metadata, including the parsed image date and time.
+        """
+        from unittest.mock import Mock
+
+        from aws.osml.model_runner.inference.feature_utils import get_source_property
+
+        dataset = Mock()
+        dataset.GetMetadata.return_value = {
+            "NITF_ICAT": "VIS",
+            "NITF_FTITLE": "test-source-id",
+            "NITF_IDATIM": "20231105143015",
+        }
+        source_property = get_source_property("s3://test-bucket/test.ntf", "NITF", dataset)
+        assert source_property["sourceMetadata"][0]["sourceDT"] == "2023-11-05T14:30:15Z"
+        assert source_property["sourceMetadata"][0]["sourceId"] == "test-source-id"
+
+        dataset.GetMetadata.return_value = {"NITF_IDATIM": "2023110514----"}
+        assert get_source_property("s3://test-bucket/test.ntf", "NITF", dataset) is None
+
+    def test_get_extents(self):
+        """
+        Test that the extents are computed from the geographic coordinates of the image corners.
+        """
+        from unittest.mock import Mock
+
+        from aws.osml.model_runner.inference.feature_utils import get_extents
+
+        ds = Mock(RasterXSize=100, RasterYSize=200)
+        extents = get_extents(ds, self.build_gdal_sensor_model())
+        assert pytest.approx(extents["west"]) == -43.681640625
+        assert pytest.approx(extents["east"]) == -43.681640625 + 100 * 4.487879136029412e-06
+        assert pytest.approx(extents["north"]) == -22.939453125
+        assert pytest.approx(extents["south"]) == -22.939453125 - 200 * 4.487879136029412e-06
+
+    def test_add_properties_to_features(self):
+        """
+        Test that inference metadata and custom properties are added to features and internal properties removed.
+        """
+        from aws.osml.model_runner.inference.feature_utils import add_properties_to_features
+
+        feature = geojson.Feature(
+            geometry=geojson.Point((0.0, 0.0)),
+            properties={
+                "inferenceTime": "2024-01-01T00:00:00",
+                "bounds_imcoords": [0, 0, 10, 10],
+                "detection_score": 0.0,
+                "image_id": "test-image-id",
+                "featureClasses": [{"iri": "ground_motor_passenger_vehicle", "score": 0.8}],
+            },
+        )
+        features = add_properties_to_features("test-job-id", '[{"modelMetadata": {"modelName": "test-model"}}]', [feature])
+
+        properties = features[0]["properties"]
+        assert properties["inferenceMetadata"] == {"jobId": "test-job-id", "inferenceDT": "2024-01-01T00:00:00"}
+        assert properties["modelMetadata"] == {"modelName": "test-model"}
+        assert properties["featureClasses"] == [{"iri": "ground_motor_passenger_vehicle", "score": 0.8}]
+        for removed_property in ("inferenceTime", "bounds_imcoords", "detection_score", "image_id"):
+            assert removed_property not in properties
+
+    def test_add_properties_to_features_precedence(self):
+        """
+        Test that later custom property dictionaries take precedence over earlier ones on every feature.
+        """
+        from aws.osml.model_runner.inference.feature_utils import add_properties_to_features
+
+        features = [
+            geojson.Feature(geometry=geojson.Point((0.0, 0.0)), properties={"inferenceTime": "2024-01-01T00:00:00"})
+            for _ in range(2)
+        ]
+        custom_properties = '[{"source": "first", "model": "test-model"}, {"source": "second"}]'
+        for feature in add_properties_to_features("test-job-id", custom_properties, features):
+            assert feature["properties"]["source"] == "second"
+            assert feature["properties"]["model"] == "test-model"
+            assert feature["properties"]["inferenceMetadata"]["jobId"] == "test-job-id"
+
     @staticmethod
     def build_gdal_sensor_model():
         from aws.osml.photogrammetry import GDALAffineSensorModel
@@ -32,11 +32,26 @@ MOCK_RESPONSE = HTTPResponse(
     status=200,
 )
 
+# Mock response simulating a feature collection whose features have missing or null properties
+MOCK_NULL_PROPERTIES_RESPONSE = HTTPResponse(
+    body=json.dumps(
+        {
+            "type": "FeatureCollection",
+            "features": [
+                {"type": "Feature", "geometry": {"type": "Point", "coordinates": [0.0, 0.0]}, "properties": None},
+                {"type": "Feature", "geometry": {"type": "Point", "coordinates": [1.0, 1.0]}},
+            ],
+        }
+    ).encode(),
+    status=200,
+)
+
 # Mock response simulating an HTTP response with invalid JSON
 MOCK_BAD_JSON_RESPONSE = HTTPResponse(body="Not a json string".encode(), status=200)
 
 
 class TestHTTPDetector(TestCase):
+    @patch("aws.osml.model_runner.inference.http_detector._http_pool", None)
     @patch("aws.osml.model_runner.inference.http_detector.urllib3.PoolManager", autospec=True)
     def test_find_features(self, mock_pool_manager):
         """
@@ -61,6 +76,22 @@ class TestHTTPDetector(TestCase):
             assert feature_collection["type"] == "FeatureCollection"
             assert len(feature_collection["features"]) == 1
 
+    @patch("aws.osml.model_runner.inference.http_detector._http_pool", None)
+    @patch("aws.osml.model_runner.inference.http_detector.urllib3.PoolManager", autospec=True)
+    def test_find_features_null_properties(self, mock_pool_manager):
+        """
+        Test that find_features replaces missing or null feature properties with an empty dictionary.
+        """
+        from aws.osml.model_runner.inference import HTTPDetector
+
+        feature_detector = HTTPDetector(endpoint="http://dummy/endpoint")
+        mock_pool_manager.return_value.request.return_value = MOCK_NULL_PROPERTIES_RESPONSE
+
+        with open("./test/data/small.ntf", "rb") as image_file:
+            feature_collection = feature_detector.find_features(image_file)
+            assert [feature["properties"] for feature in feature_collection["features"]] == [{}, {}]
+
+    @patch("aws.osml.model_runner.inference.http_detector._http_pool", None)
     @patch("aws.osml.model_runner.inference.http_detector.urllib3.PoolManager", autospec=True)
     def test_find_features_RetryError(self, mock_pool_manager):
         """
@@ -81,6 +112,7 @@ class TestHTTPDetector(TestCase):
             with pytest.raises(RetryError):
                 feature_detector.find_features(image_file)
 
+    @patch("aws.osml.model_runner.inference.http_detector._http_pool", None)
     @patch("aws.osml.model_runner.inference.http_detector.urllib3.PoolManager", autospec=True)
     def test_find_features_MaxRetryError(self, mock_pool_manager):
         """
@@ -101,6 +133,7 @@ class TestHTTPDetector(TestCase):
             with pytest.raises(MaxRetryError):
                 feature_detector.find_features(image_file)
 
+    @patch("aws.osml.model_runner.inference.http_detector._http_pool", None)
     @patch("aws.osml.model_runner.inference.http_detector.urllib3.PoolManager", autospec=True)
     def test_find_features_JSONDecodeError(self, mock_pool_manager):
         """
@@ -119,6 +152,225 @@ class TestHTTPDetector(TestCase):
             with pytest.raises(JSONDecodeError):
                 feature_detector.find_features(image_file)
 
+    @patch("aws.osml.model_runner.inference.http_detector._http_pool", None)
+    @patch("aws.osml.model_runner.inference.http_detector.urllib3.PoolManager", autospec=True)
+    def test_detectors_share_pool_manager(self, mock_pool_manager):
+        """
+        Test that detectors share a single pool manager and apply a deadline-bound copy of their own retry policy to
+        each request.
+        """
+        from urllib3.util.retry import Retry
+
+        from aws.osml.model_runner.inference import HTTPDetector
+
+        first_detector = HTTPDetector(endpoint="http://dummy/first")
+        second_detector = HTTPDetector(endpoint="http://dummy/second", retry=Retry(total=2))
+        assert first_detector.http_pool is second_detector.http_pool
+        mock_pool_manager.assert_called_once()
+
+        mock_pool_manager.return_value.request.return_value = MOCK_RESPONSE
+        with open("./test/data/small.ntf", "rb") as image_file:
+            second_detector.find_features(image_file)
+        _, kwargs = mock_pool_manager.return_value.request.call_args
+        assert kwargs["retries"] is not second_detector.retry
+        assert kwargs["retries"].total == 2
+        assert kwargs["retries"].deadline is not None
+        assert second_detector.retry.deadline is None
+
+    @patch("aws.osml.model_runner.inference.http_detector._http_pool", None)
+    @patch("aws.osml.model_runner.inference.http_detector.urllib3.PoolManager", autospec=True)
+    def test_pool_manager_certificate_verification(self, mock_pool_manager):
+        """
+        Test that the shared pool manager verifies TLS certificates unless insecure HTTP detectors are configured.
+        """
+        from aws.osml.model_runner.app_config import ServiceConfig
+        from aws.osml.model_runner.inference.http_detector import _get_http_pool
+
+        _get_http_pool()
+        _, kwargs = mock_pool_manager.call_args
+        assert kwargs["cert_reqs"] == "CERT_REQUIRED"
+
+        with patch("aws.osml.model_runner.inference.http_detector._http_pool", None):
+            with patch.object(ServiceConfig, "insecure_http_detector", True):
+                _get_http_pool()
+        _, kwargs = mock_pool_manager.call_args
+        assert kwargs["cert_reqs"] == "CERT_NONE"
+
+    def test_counting_retry_from_retry(self):
+        """
+        Test that converting a Retry to a CountingRetry keeps all of its settings and leaves the original unchanged.
+        """
+        from urllib3.util.retry import Retry
+
+        from aws.osml.model_runner.inference.http_detector import CountingRetry
+
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[503])
+        counting_retry = CountingRetry.from_retry(retry)
+        assert isinstance(counting_retry, CountingRetry)
+        assert counting_retry.retry_counts == 0
+        assert counting_retry.total == 3
+        assert counting_retry.backoff_factor == 0.5
+        assert counting_retry.status_forcelist == [503]
+        assert type(retry) is Retry
+        assert CountingRetry.from_retry(counting_retry) is counting_retry
+
+    def test_counting_retry_full_jitter_backoff(self):
+        """
+        Test that the retry backoff is a random duration bounded by the exponential backoff.
+        """
+        from urllib3.exceptions import ConnectTimeoutError
+
+        from aws.osml.model_runner.inference.http_detector import CountingRetry
+
+        retry = CountingRetry(total=8, backoff_factor=1)
+        assert retry.get_backoff_time() == 0
+        for _ in range(3):
+            retry = retry.increment(method="POST", url="/", error=ConnectTimeoutError())
+        assert retry.retry_counts == 3
+
+        with patch("aws.osml.model_runner.inference.http_detector.random.uniform", return_value=1.5) as mock_uniform:
+            assert retry.get_backoff_time() == 1.5
+            mock_uniform.assert_called_once_with(0, 4.0)
+
+    def test_counting_retry_transient_status_and_retry_after(self):
+        """
+        Test that the default policy retries overloaded endpoint responses to a POST but not model errors, and that a
+        Retry-After delay requested by the endpoint is capped at the maximum backoff.
+        """
+        from urllib3.util.retry import Retry
+
+        from aws.osml.model_runner.inference import HTTPDetector
+
+        retry = HTTPDetector(endpoint="http://dummy/endpoint").retry
+        backoff_max = getattr(retry, "backoff_max", Retry.DEFAULT_BACKOFF_MAX)
+        assert retry.is_retry("POST", 503, has_retry_after=False)
+        assert retry.is_retry("POST", 429, has_retry_after=True)
+        assert not retry.is_retry("POST", 500, has_retry_after=False)
+        assert not retry.is_retry("POST", 400, has_retry_after=False)
+
+        assert retry.get_retry_after(HTTPResponse(status=503)) is None
+        assert retry.get_retry_after(HTTPResponse(status=503, headers={"Retry-After": "5"})) == 5
+        assert retry.get_retry_after(HTTPResponse(status=503, headers={"Retry-After": "3600"})) == backoff_max
+
+    def test_counting_retry_deadline(self):
+        """
+        Test that a retry policy stops retrying once its deadline passes and never sleeps beyond it.
+        """
+        from urllib3.exceptions import ConnectTimeoutError, MaxRetryError
+
+        from aws.osml.model_runner.inference.http_detector import CountingRetry
+
+        with patch("aws.osml.model_runner.inference.http_detector.time.monotonic", return_value=100.0):
+            retry = CountingRetry(total=8, backoff_factor=1).new(deadline=103.0)
+            retry = retry.increment(method="POST", url="/", error=ConnectTimeoutError())
+            assert retry.deadline == 103.0
+            for _ in range(4):
+                retry = retry.increment(method="POST", url="/", error=ConnectTimeoutError())
+            assert retry.get_backoff_time() <= 3.0
+            assert retry.get_retry_after(HTTPResponse(status=503, headers={"Retry-After": "60"})) == 3.0
+
+        with patch("aws.osml.model_runner.inference.http_detector.time.monotonic", return_value=103.0):
+            with pytest.raises(MaxRetryError):
+                retry.increment(method="POST", url="/", error=ConnectTimeoutError())
+
+    @patch("aws.osml.model_runner.inference.http_detector._http_pool", None)
+    def test_find_features_abandons_slow_endpoint(self):
+        """
+        Test that a request to an endpoint that stops responding is abandoned once the inference deadline passes,
+        even when the attempt that hangs is a retry started shortly before the deadline.
+        """
+        import threading
+        import time
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        from urllib3.exceptions import MaxRetryError
+
+        from aws.osml.model_runner.app_config import ServiceConfig
+        from aws.osml.model_runner.inference import HTTPDetector
+
+        release = threading.Event()
+        request_count = []
+
+        class SlowHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                request_count.append(1)
+                if len(request_count) == 1:
+                    # The first attempt is rejected as overloaded late enough that a retry given the full deadline
+                    # would run well past it
+                    time.sleep(0.6)
+                    self.send_response(503)
+                    self.send_header("Retry-After", "0")
+                    self.send_header("Content-Length", "0")
+                    self.send_header("Connection", "close")
+                    self.end_headers()
+                else:
+                    release.wait(10)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            feature_detector = HTTPDetector(endpoint=f"http://127.0.0.1:{server.server_port}/invocations")
+            with patch.object(ServiceConfig, "inference_deadline", "1.0"):
+                start = time.monotonic()
+                with pytest.raises(MaxRetryError):
+                    feature_detector.find_features(b"payload")
+                assert time.monotonic() - start < 1.4
+            assert len(request_count) == 2
+        finally:
+            release.set()
+            server.shutdown()
+            server.server_close()
+
+    def test_deadline_timeout_clone(self):
+        """
+        Test that every attempt's timeout is limited to the time remaining before the deadline.
+        """
+        from aws.osml.model_runner.inference.http_detector import MIN_ATTEMPT_TIMEOUT, DeadlineTimeout
+
+        with patch("aws.osml.model_runner.inference.http_detector.time.monotonic", return_value=100.0):
+            timeout = DeadlineTimeout(110.0)
+        assert timeout.total == 10.0
+
+        with patch("aws.osml.model_runner.inference.http_detector.time.monotonic", return_value=107.5):
+            attempt_timeout = timeout.clone()
+        assert isinstance(attempt_timeout, DeadlineTimeout)
+        assert attempt_timeout.total == 2.5
+
+        with patch("aws.osml.model_runner.inference.http_detector.time.monotonic", return_value=111.0):
+            assert timeout.clone().total == MIN_ATTEMPT_TIMEOUT
+
+    @patch("aws.osml.model_runner.inference.http_detector._http_pool", None)
+    @patch("aws.osml.model_runner.inference.http_detector.urllib3.PoolManager", autospec=True)
+    def test_find_features_retries_metric(self, mock_pool_manager):
+        """
+        Test that the retries metric reports the retries recorded on the policy returned with the response.
+        """
+        import inspect
+        from unittest.mock import Mock
+
+        from aws.osml.model_runner.app_config import MetricLabels
+        from aws.osml.model_runner.inference import HTTPDetector
+        from aws.osml.model_runner.inference.http_detector import CountingRetry
+
+        feature_detector = HTTPDetector(endpoint="http://dummy/endpoint")
+        final_retry = CountingRetry(total=8)
+        final_retry.retry_counts = 2
+        mock_pool_manager.return_value.request.return_value = HTTPResponse(
+            body=json.dumps({"type": "FeatureCollection", "features": []}).encode(), status=200, retries=final_retry
+        )
+
+        mock_metrics = Mock()
+        with open("./test/data/small.ntf", "rb") as image_file:
+            inspect.unwrap(HTTPDetector.find_features)(feature_detector, image_file, metrics=mock_metrics)
+
+        mock_metrics.put_metric.assert_any_call(MetricLabels.RETRIES, 2, "Count")
+        assert feature_detector.retry.retry_counts == 0
+
 
 if __name__ == "__main__":
     unittest.main()
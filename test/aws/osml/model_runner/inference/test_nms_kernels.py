@@ -0,0 +1,109 @@
+#  Copyright 2023-2024 Amazon.com, Inc. or its affiliates.
+
+import importlib.util
+import unittest
+from unittest import TestCase
+
+import numpy as np
+
+NUMEXPR_INSTALLED = importlib.util.find_spec("numexpr") is not None
+
+
+class TestNMSKernels(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(seed=42)
+        corners = rng.uniform(0, 1000, size=(600, 2))
+        sizes = rng.uniform(5, 60, size=(600, 2))
+        self.boxes = np.hstack([corners, corners + sizes])
+        self.scores = rng.uniform(size=600)
+
+    def test_cluster_nms_suppresses_overlaps(self):
+        from aws.osml.model_runner.inference.nms_kernels import cluster_nms
+
+        boxes = np.array([[50, 50, 100, 100], [45, 45, 101, 101], [250, 250, 300, 275]], dtype=np.float64)
+        scores = np.array([0.45, 0.57, 0.80])
+        assert cluster_nms(boxes, scores, 0.75).tolist() == [2, 1]
+
+    def test_cluster_nms_matches_greedy_nms(self):
+        from aws.osml.model_runner.inference.nms_kernels import cluster_nms
+
+        # Box b suppresses box c but is itself suppressed by box a so greedy NMS keeps box c
+        boxes = np.array([[0, 0, 10, 10], [4, 0, 14, 10], [8, 0, 18, 10]], dtype=np.float64)
+        scores = np.array([0.9, 0.8, 0.7])
+        assert cluster_nms(boxes, scores, 0.3).tolist() == [0, 2]
+
+    def test_cluster_nms_sparse_matches_cluster_nms(self):
+        from aws.osml.model_runner.inference.nms_kernels import cluster_nms, cluster_nms_sparse
+
+        for iou_thr in (0.1, 0.5):
+            expected = cluster_nms(self.boxes, self.scores, iou_thr)
+            assert np.array_equal(cluster_nms_sparse(self.boxes, self.scores, iou_thr), expected)
+
+    def test_overlapping_pairs_with_one_huge_box(self):
+        from aws.osml.model_runner.inference.nms_kernels import _overlapping_pairs, cluster_nms, cluster_nms_sparse
+
+        boxes = np.vstack([self.boxes, [[-10, -10, 1010, 1010]]])
+        scores = np.append(self.scores, 0.5)
+        rows, cols = _overlapping_pairs(boxes)
+        # The huge box pairs with every other box but must not pull the small boxes into a single cell
+        assert len(rows) < len(boxes) ** 2 / 10
+        assert np.count_nonzero(rows == len(boxes) - 1) == len(boxes) - 1
+        assert len(set(zip(rows.tolist(), cols.tolist()))) == len(rows)
+        assert np.array_equal(cluster_nms_sparse(boxes, scores, 0.1), cluster_nms(boxes, scores, 0.1))
+
+    def test_soft_nms_asap_matches_soft_nms_numpy(self):
+        from aws.osml.model_runner.inference.nms_kernels import soft_nms_asap, soft_nms_numpy
+
+        expected_keep, expected_scores = soft_nms_numpy(self.boxes, self.scores, 0.1, 0.0001)
+        keep, scores = soft_nms_asap(self.boxes, self.scores, 0.1, 0.0001, iou_floor=0.0)
+        assert np.array_equal(keep, expected_keep)
+        assert np.allclose(scores, expected_scores)
+
+    def test_offset_boxes_by_label_separates_labels(self):
+        from aws.osml.model_runner.inference.nms_kernels import cluster_nms, offset_boxes_by_label
+
+        boxes = np.array([[-50, -50, 10, 10], [-45, -45, 12, 12]], dtype=np.float64)
+        scores = np.array([0.9, 0.8])
+        assert cluster_nms(boxes, scores, 0.5).tolist() == [0]
+        boxes = offset_boxes_by_label(boxes, np.array([0, 1]))
+        assert cluster_nms(boxes, scores, 0.5).tolist() == [0, 1]
+
+    def test_offset_boxes_by_label_uses_float64(self):
+        from aws.osml.model_runner.inference.nms_kernels import offset_boxes_by_label
+
+        small = np.array([[0, 0, 10, 10], [1, 1, 11, 11]], dtype=np.float32)
+        shifted = offset_boxes_by_label(small, np.array([0, 1]))
+        assert shifted.dtype == np.float64
+        assert shifted.tolist() == [[0, 0, 10, 10], [13, 13, 23, 23]]
+        assert small.tolist() == [[0, 0, 10, 10], [1, 1, 11, 11]]
+
+        # A full-scene span with a high label id keeps the 0.1 pixel width of a padded point box
+        boxes = np.array([[0, 0, 10, 10], [25000.5, 25000.5, 25000.6, 25000.6]], dtype=np.float32)
+        shifted = offset_boxes_by_label(boxes, np.array([0, 150]))
+        assert np.isclose(shifted[1, 2] - shifted[1, 0], 0.1, atol=1e-3)
+
+    def test_precomputed_areas_match_computed_areas(self):
+        from aws.osml.model_runner.inference.nms_kernels import box_areas, nms, soft_nms
+
+        areas = box_areas(self.boxes)
+        assert np.array_equal(nms(self.boxes, self.scores, 0.5, areas=areas), nms(self.boxes, self.scores, 0.5))
+        expected_keep, expected_scores = soft_nms(self.boxes, self.scores, 0.1, 0.0001)
+        keep, scores = soft_nms(self.boxes, self.scores, 0.1, 0.0001, areas=areas)
+        assert np.array_equal(keep, expected_keep)
+        assert np.array_equal(scores, expected_scores)
+
+    @unittest.skipUnless(NUMEXPR_INSTALLED, "numexpr is not installed")
+    def test_numexpr_iou_matches_numpy(self):
+        from unittest.mock import patch
+
+        from aws.osml.model_runner.inference import nms_kernels
+
+        boxes = self.boxes.astype(np.float32)
+        areas = nms_kernels.box_areas(boxes)
+        expected = nms_kernels._upper_iou_matrix(boxes, areas)
+        with patch.object(nms_kernels, "USE_NUMEXPR", True):
+            assert np.allclose(nms_kernels._upper_iou_matrix(boxes, areas), expected, atol=1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
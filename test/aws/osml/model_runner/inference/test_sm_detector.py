@@ -40,6 +40,14 @@ MOCK_MODEL_RESPONSE = {
 
 
 class TestSMDetector(TestCase):
+    def setUp(self):
+        """
+        Clear the shared SageMaker clients so stubs attached by one test don't leak into the next.
+        """
+        from aws.osml.model_runner.inference.sm_detector import _create_sm_client
+
+        _create_sm_client.cache_clear()
+
     def test_construct_with_execution_role(self):
         """
         Test the construction of SMDetector with AWS credentials passed,
@@ -97,6 +105,41 @@ class TestSMDetector(TestCase):
             assert feature_collection["type"] == "FeatureCollection"
             assert len(feature_collection["features"]) == 1
 
+    def test_find_features_null_properties(self):
+        """
+        Test that find_features replaces missing or null feature properties with an empty dictionary.
+        """
+        from aws.osml.model_runner.inference import SMDetector
+
+        feature_detector = SMDetector("test-endpoint")
+        sm_runtime_stub = Stubber(feature_detector.sm_client)
+        sm_runtime_stub.add_response(
+            "invoke_endpoint",
+            expected_params={"EndpointName": "test-endpoint", "Body": ANY},
+            service_response={
+                "Body": io.StringIO(
+                    json.dumps(
+                        {
+                            "type": "FeatureCollection",
+                            "features": [
+                                {
+                                    "type": "Feature",
+                                    "geometry": {"type": "Point", "coordinates": [0.0, 0.0]},
+                                    "properties": None,
+                                },
+                                {"type": "Feature", "geometry": {"type": "Point", "coordinates": [1.0, 1.0]}},
+                            ],
+                        }
+                    )
+                )
+            },
+        )
+        sm_runtime_stub.activate()
+
+        feature_collection = feature_detector.find_features(b"test-payload")
+        sm_runtime_stub.assert_no_pending_responses()
+        assert [feature["properties"] for feature in feature_collection["features"]] == [{}, {}]
+
     def test_find_features_throw_json_exception(self):
         """
         Test that find_features raises a JSONDecodeError when the SageMaker response
@@ -171,6 +214,20 @@ class TestSMDetector(TestCase):
         assert http_detector.mode == ModelInvokeMode.HTTP_ENDPOINT
         assert http_detector.endpoint == http_name
 
+    def test_detectors_share_sm_client(self):
+        """
+        Test that detectors invoking endpoints with the same credentials share a SageMaker runtime client.
+        """
+        from aws.osml.model_runner.inference import SMDetector
+
+        credentials = {"AccessKeyId": "FAKE-ACCESS-KEY-ID", "SecretAccessKey": "FAKE-ACCESS-KEY", "SessionToken": "A"}
+        assert SMDetector("first-endpoint").sm_client is SMDetector("second-endpoint").sm_client
+        assert SMDetector("first-endpoint", credentials).sm_client is SMDetector("second-endpoint", credentials).sm_client
+        assert (
+            SMDetector("first-endpoint", credentials).sm_client
+            is not SMDetector("first-endpoint", {**credentials, "SessionToken": "B"}).sm_client
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
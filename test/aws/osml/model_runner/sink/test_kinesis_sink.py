@@ -108,8 +108,10 @@ class TestKinesisSink(unittest.TestCase):
             {"StreamName": TEST_RESULTS_STREAM},
         )
 
+        from aws.osml.model_runner.common import feature_collection_to_bytes
+
         records = [
-            {"Data": geojson.dumps(FeatureCollection([feature])), "PartitionKey": TEST_JOB_ID}
+            {"Data": feature_collection_to_bytes(FeatureCollection([feature])), "PartitionKey": TEST_JOB_ID}
             for feature in self.test_feature_list
         ]
 
@@ -140,8 +142,10 @@ class TestKinesisSink(unittest.TestCase):
             {"StreamName": TEST_RESULTS_STREAM},
         )
 
+        from aws.osml.model_runner.common import feature_collection_to_bytes
+
         records = [
-            {"Data": geojson.dumps(FeatureCollection([feature])), "PartitionKey": TEST_JOB_ID}
+            {"Data": feature_collection_to_bytes(FeatureCollection([feature])), "PartitionKey": TEST_JOB_ID}
             for feature in self.test_feature_list
         ]
 
@@ -67,6 +67,30 @@ class TestS3Sink(unittest.TestCase):
         s3_sink.write(TEST_IMAGE_ID, self.sample_feature_list)
         s3_client_stub.assert_no_pending_responses()
 
+    def test_write_features_ndjson(self):
+        """
+        Write features to S3 as newline delimited GeoJSON features.
+        Ensures that the object is written with one feature per line under an .ndjson key.
+        """
+        from aws.osml.model_runner.api import SinkFormat
+        from aws.osml.model_runner.sink.s3_sink import S3Sink
+
+        s3_sink = S3Sink(TEST_RESULTS_BUCKET, TEST_PREFIX, output_format=SinkFormat.NDJSON)
+        written_lines = []
+
+        def mock_upload_file(Filename, **kwargs):
+            with open(Filename, "rb") as f:
+                written_lines.extend(f.read().splitlines())
+            assert kwargs["Key"] == f"{TEST_PREFIX}/{TEST_IMAGE_ID}.ndjson"
+
+        with mock.patch.object(s3_sink, "validate_s3_bucket", return_value=True), mock.patch.object(
+            s3_sink.s3_client, "upload_file", side_effect=mock_upload_file
+        ):
+            assert s3_sink.write(TEST_IMAGE_ID, self.sample_feature_list)
+
+        assert len(written_lines) == len(self.sample_feature_list)
+        assert geojson.loads(written_lines[0]) == self.sample_feature_list[0]
+
     def test_write_features_default_credentials_image_id_with_slash(self):
         """
         Write features to S3 when image ID contains slashes.
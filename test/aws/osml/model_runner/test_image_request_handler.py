@@ -167,6 +167,18 @@ class TestImageRequestHandler(TestCase):
         )
         self.mock_job_table.end_image_request.assert_called_once_with(self.mock_job_item.image_id)
 
+    def test_end_image_request_without_metrics(self):
+        """
+        Test that end_image_request reports its metrics to the null logger when invoked without a metrics logger.
+        """
+        self.mock_job_item.processing_duration = 10
+        self.mock_job_item.region_error = 1
+
+        self.handler.end_image_request.__wrapped__(self.handler, self.mock_job_item, "NITF")
+
+        self.mock_job_table.end_image_request.assert_called_once_with(self.mock_job_item.image_id)
+        self.mock_image_status_monitor.process_event.assert_called_once()
+
 
 if __name__ == "__main__":
     main()
@@ -56,6 +56,61 @@ class TestModelRunner(unittest.TestCase):
         self.runner.image_request_handler.complete_image_request.assert_called_once()
         mock_finish_request.assert_called_once_with("receipt_handle")
 
+    @patch("aws.osml.model_runner.model_runner.RequestQueue.finish_request")
+    @patch("aws.osml.model_runner.model_runner.load_gdal_dataset")
+    def test_process_region_requests_reuses_dataset(self, mock_load_gdal, mock_finish_request):
+        """Test that regions of the same image reuse the opened dataset until the image is complete."""
+        mock_load_gdal.return_value = (MagicMock(), MagicMock())
+        self.runner._get_or_create_region_request_item = MagicMock()
+        self.runner.job_table.is_image_request_complete = MagicMock(side_effect=[False, True])
+
+        # Simulate two regions of the same image
+        region_request_attributes = {"region_id": "region_123", "image_url": "./test/data/small.ntf"}
+        self.runner.region_requests_iter = iter(
+            [("receipt_handle_1", region_request_attributes), ("receipt_handle_2", region_request_attributes)]
+        )
+
+        # Call method for both regions
+        self.runner._process_region_requests()
+        assert ("./test/data/small.ntf", "") in self.runner.dataset_cache
+        self.runner._process_region_requests()
+
+        # Ensure the image was only opened once and released once the image was complete
+        mock_load_gdal.assert_called_once_with("./test/data/small.ntf")
+        assert ("./test/data/small.ntf", "") not in self.runner.dataset_cache
+        assert mock_finish_request.call_count == 2
+
+    @patch("aws.osml.model_runner.model_runner.RequestQueue.finish_request")
+    @patch("aws.osml.model_runner.model_runner.load_gdal_dataset")
+    def test_process_region_requests_dataset_per_read_role(self, mock_load_gdal, mock_finish_request):
+        """Test that regions of the same image read with different roles do not share an opened dataset."""
+        mock_load_gdal.return_value = (MagicMock(), MagicMock())
+        self.runner._get_or_create_region_request_item = MagicMock()
+        self.runner.job_table.is_image_request_complete = MagicMock(return_value=False)
+
+        # Simulate regions of the same image from two jobs with different read roles
+        self.runner.region_requests_iter = iter(
+            [
+                ("receipt_handle_1", {"region_id": "region_1", "image_url": "./test/data/small.ntf"}),
+                (
+                    "receipt_handle_2",
+                    {
+                        "region_id": "region_2",
+                        "image_url": "./test/data/small.ntf",
+                        "image_read_role": "arn:aws:iam::012345678910:role/OtherReadRole",
+                    },
+                ),
+            ]
+        )
+
+        self.runner._process_region_requests()
+        self.runner._process_region_requests()
+
+        # Ensure the image was opened once for each read role
+        assert mock_load_gdal.call_count == 2
+        assert ("./test/data/small.ntf", "") in self.runner.dataset_cache
+        assert ("./test/data/small.ntf", "arn:aws:iam::012345678910:role/OtherReadRole") in self.runner.dataset_cache
+
     @patch("aws.osml.model_runner.model_runner.ImageRequest")
     @patch("aws.osml.model_runner.model_runner.RequestQueue.finish_request")
     def test_process_image_requests_invalid(self, mock_finish_request, mock_image_request):
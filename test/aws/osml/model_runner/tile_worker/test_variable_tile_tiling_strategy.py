@@ -207,8 +207,9 @@ class TestVariableTileTilingStrategy(TestCase):
         # Verify the correct number of deconflicted features
         assert len(deduped_features) == 6
 
-        # Verify that the feature selector was called for each overlapping group
-        assert len(mock_feature_selector.method_calls) == 4
+        # Verify that the feature selector was called once with every overlapping group
+        mock_feature_selector.select_features_batch.assert_called_once()
+        assert len(mock_feature_selector.select_features_batch.call_args[0][0]) == 4
 
 
 if __name__ == "__main__":
@@ -262,9 +262,13 @@ class TestModelRunnerEndToEnd(TestCase):
         features are created, and the correct metadata is stored in S3. Checks that we calculated
         the max in progress regions with the test instance type is set to m5.12xl with 48 vcpus.
         """
+        from aws.osml.model_runner.inference.sm_detector import _create_sm_client
+
         with patch("aws.osml.model_runner.inference.sm_detector.boto3") as mock_boto3:
-            # Build stubbed model client for ModelRunner to interact with
+            # Build stubbed model client for ModelRunner to interact with. Detectors share cached clients so drop
+            # any created by earlier tests to make sure the stubbed client is used.
             mock_boto3.client.return_value = self.get_stubbed_sm_client()
+            _create_sm_client.cache_clear()
             self.model_runner.image_request_handler.process_image_request(self.image_request)
 
             # Ensure that the single region was processed successfully